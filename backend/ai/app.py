@@ -21,9 +21,11 @@ import re
 from datetime import datetime
 from typing import Literal, Optional, Tuple
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, APIRouter, File, Form, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from zoneinfo import ZoneInfo
 
@@ -289,16 +291,16 @@ def _parse_json_response(text: str) -> dict:
 
     # 먼저 그대로 파싱 시도
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
+        return orjson.loads(json_str)
+    except orjson.JSONDecodeError:
         pass
 
     # 실패 시 복구 후 재시도 (개행 이스케이프 + 괄호 닫기)
     fixed = _fix_truncated_json(json_str)
     try:
         logger.warning("JSON 복구 적용됨 (개행/괄호 수정)")
-        return json.loads(fixed)
-    except json.JSONDecodeError as e:
+        return orjson.loads(fixed)
+    except orjson.JSONDecodeError as e:
         logger.error(f"JSON 복구 실패: {e}")
 
     # 최종 fallback: 정규식으로 부분 필드 추출
@@ -413,10 +415,10 @@ def _parse_categories(categories_input: str) -> list[str] | None:
     if not categories_input:
         return None
     try:
-        parsed = json.loads(categories_input)
+        parsed = orjson.loads(categories_input)
         if isinstance(parsed, list) and len(parsed) > 0:
             return parsed
-    except (json.JSONDecodeError, TypeError):
+    except (orjson.JSONDecodeError, TypeError):
         # 쉼표 구분 문자열로 처리
         items = [s.strip() for s in categories_input.split(",") if s.strip()]
         if items:
@@ -700,6 +702,7 @@ app = FastAPI(
     title="AI Analyzer (Gemini)",
     description="텍스트/이미지/PDF를 분석하여 일정 또는 메모로 분류",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
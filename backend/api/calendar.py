@@ -2,17 +2,34 @@
 Google Calendar API endpoints.
 """
 
+import asyncio
+import logging
+import re
+from typing import List, Tuple
+
 from fastapi import APIRouter, Header
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from postgrest.exceptions import APIError
 
-from database import supabase
+from database import supabase_async
 from models.schemas import CalendarEvent
-from helpers.calendar_helpers import CATEGORY_COLOR_MAP
+from helpers.category_helpers import invalidate_categories
+from helpers.calendar_helpers import (
+    CATEGORY_COLOR_MAP,
+    DEFAULT_CATEGORY_COLOR,
+    insert_google_calendar_event,
+    list_google_calendars,
+    refresh_calendar_list_cache,
+    resolve_calendar_id,
+)
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
+# Holiday / contacts calendar ids ("holiday" in any case), matched without lowercasing a copy
+_SYSTEM_CALENDAR_RE = re.compile(r"(?i:holiday)|#contacts")
+
 
 @router.post("/sync")
 async def sync_google_calendars(
@@ -30,62 +47,38 @@ async def sync_google_calendars(
         return {"status": "error", "message": "Google token required"}
 
     try:
-        creds = Credentials(token=google_token)
-        service = build("calendar", "v3", credentials=creds)
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get("items", [])
+        calendars = await list_google_calendars(google_token)
+        refresh_calendar_list_cache(user_id, google_token, calendars)
 
         valid_calendar_names = []
         skipped = []
         for cal in calendars:
             cal_name = cal.get("summary", "Untitled")
-            cal_id = cal.get("id")
-            access_role = cal.get("accessRole", "")
-            is_primary = cal.get("primary", False)
-
-            if access_role != "owner":
-                skipped.append({"name": cal_name, "reason": "not owner"})
-                continue
-            if is_primary:
-                skipped.append({"name": cal_name, "reason": "primary calendar"})
+            # Cheapest checks first; the id is only scanned for owned, non-primary calendars
+            if cal.get("accessRole") != "owner":
+                reason = "not owner"
+            elif cal.get("primary"):
+                reason = "primary calendar"
+            elif _SYSTEM_CALENDAR_RE.search(cal.get("id", "")):
+                reason = "system calendar"
+            else:
+                valid_calendar_names.append(cal_name)
                 continue
-            if "holiday" in cal_id.lower() or "#contacts" in cal_id:
-                skipped.append({"name": cal_name, "reason": "system calendar"})
-                continue
-
-            valid_calendar_names.append(cal_name)
-
-        # Fetch user's existing CALENDAR categories
-        existing_categories = (
-            supabase.table("category")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("type", "CALENDAR")
-            .execute()
-        )
-        existing_names = {cat["name"] for cat in existing_categories.data} if existing_categories.data else set()
-        valid_names_set = set(valid_calendar_names)
+            skipped.append({"name": cal_name, "reason": reason})
 
-        # Delete categories that no longer exist in Google Calendar
-        deleted = []
-        to_delete = existing_names - valid_names_set
-        for name in to_delete:
-            supabase.table("category").delete().eq("name", name).eq("user_id", user_id).eq("type", "CALENDAR").execute()
-            deleted.append(name)
+        valid_names = list(dict.fromkeys(valid_calendar_names))
+        try:
+            added, deleted = await _replace_calendar_categories(user_id, valid_names)
+        finally:
+            # One of the two writes may have landed even if the other failed
+            invalidate_categories(user_id)
 
-        # Add new categories from Google Calendar
-        to_add = valid_names_set - existing_names
-        added = []
-        for name in to_add:
-            supabase.table("category").insert({"name": name, "type": "CALENDAR", "user_id": user_id}).execute()
-            added.append(name)
-
-        kept = valid_names_set & existing_names
+        kept = set(valid_names).difference(added)
 
         return {
             "status": "success",
-            "added": list(added),
-            "deleted": list(deleted),
+            "added": added,
+            "deleted": deleted,
             "kept": list(kept),
             "skipped": skipped,
             "total_synced": len(valid_calendar_names),
@@ -94,6 +87,62 @@ async def sync_google_calendars(
         return {"status": "error", "message": str(e)}
 
 
+async def _replace_calendar_categories(user_id: str, valid_names: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Make the user's CALENDAR categories exactly valid_names in two concurrent requests.
+
+    INSERT ... ON CONFLICT DO NOTHING returns only the rows it inserted, and DELETE
+    returns the rows it removed, so no read is needed to report the diff.
+    """
+    delete = supabase_async.table("category").delete().eq("user_id", user_id).eq("type", "CALENDAR")
+    if valid_names:
+        delete = delete.not_.in_("name", valid_names)
+    requests = [delete.execute()]
+    if valid_names:
+        requests.append(
+            supabase_async.table("category").upsert(
+                [{"name": name, "type": "CALENDAR", "user_id": user_id} for name in valid_names],
+                on_conflict="user_id,type,name",
+                ignore_duplicates=True,
+            ).execute()
+        )
+    # Collect both outcomes - the delete may have committed even if the upsert failed
+    deleted_result, *inserted_result = await asyncio.gather(*requests, return_exceptions=True)
+    if isinstance(deleted_result, BaseException):
+        raise deleted_result
+    deleted = [row["name"] for row in deleted_result.data]
+    if not inserted_result:
+        return [], deleted
+
+    inserted = inserted_result[0]
+    if isinstance(inserted, APIError) and inserted.code == "42P10":
+        # No unique (user_id, type, name) index yet (migrations/002) - insert the difference instead
+        logger.warning("[Calendar] category unique index missing, falling back to diff insert")
+        return await _insert_missing_calendar_categories(user_id, valid_names), deleted
+    if isinstance(inserted, BaseException):
+        raise inserted
+    return [row["name"] for row in inserted.data], deleted
+
+
+async def _insert_missing_calendar_categories(user_id: str, valid_names: List[str]) -> List[str]:
+    """Read existing CALENDAR categories and insert the valid names not among them."""
+    existing = await (
+        supabase_async.table("category")
+        .select("name")
+        .eq("user_id", user_id)
+        .eq("type", "CALENDAR")
+        .execute()
+    )
+    existing_names = {cat["name"] for cat in existing.data}
+
+    added = [name for name in valid_names if name not in existing_names]
+    if added:
+        await supabase_async.table("category").insert(
+            [{"name": name, "type": "CALENDAR", "user_id": user_id} for name in added]
+        ).execute()
+    return added
+
+
 @router.post("/create")
 async def create_calendar_event(
     event_data: CalendarEvent, google_token: str = Header(None, alias="X-Google-Token")
@@ -110,16 +159,8 @@ async def create_calendar_event(
         return {"status": "error", "message": "Google token required"}
 
     try:
-        creds = Credentials(token=google_token)
-        service = build("calendar", "v3", credentials=creds)
-
-        calendar_id = "primary"
-        if event_data.calendar_name:
-            calendar_list = service.calendarList().list().execute()
-            for cal in calendar_list.get("items", []):
-                if cal.get("summary") == event_data.calendar_name:
-                    calendar_id = cal.get("id")
-                    break
+        # Name -> id mapping is cached per token digest (falls back to "primary")
+        calendar_id = await resolve_calendar_id(None, google_token, event_data.calendar_name)
 
         event_body = {
             "summary": event_data.summary,
@@ -129,10 +170,9 @@ async def create_calendar_event(
         }
 
         if event_data.category:
-            color_id = CATEGORY_COLOR_MAP.get(event_data.category.lower(), CATEGORY_COLOR_MAP["default"])
-            event_body["colorId"] = color_id
+            event_body["colorId"] = CATEGORY_COLOR_MAP.get(event_data.category.lower(), DEFAULT_CATEGORY_COLOR)
 
-        event = service.events().insert(calendarId=calendar_id, body=event_body).execute()
+        event = await insert_google_calendar_event(google_token, calendar_id, event_body)
         return {"status": "success", "link": event.get("htmlLink"), "calendar_id": calendar_id, "event_id": event.get("id")}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -148,14 +188,15 @@ async def disconnect_google_calendar(user_id: str):
     """
     try:
         # Delete all CALENDAR type categories for this user
-        supabase.table("category").delete().eq("user_id", user_id).eq("type", "CALENDAR").execute()
+        await supabase_async.table("category").delete().eq("user_id", user_id).eq("type", "CALENDAR").execute()
+        invalidate_categories(user_id)
 
         return {
             "status": "success",
             "message": "Google Calendar disconnected successfully"
         }
     except Exception as e:
-        print(f"[Calendar] Disconnect error: {e}")
+        logger.warning("[Calendar] Disconnect error: %s", e)
         return {
             "status": "error",
             "message": str(e)
@@ -3,10 +3,12 @@ Categories CRUD endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
-from database import supabase
+from database import supabase_async
 from models.schemas import CategoryRequest
+from helpers.category_helpers import get_cached_categories, invalidate_categories, set_cached_categories
 
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
@@ -14,12 +16,16 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 
 @router.get("")
 async def get_categories(user_id: str, type: Optional[str] = None):
-    """Get user's categories"""
-    query = supabase.table("category").select("*").eq("user_id", user_id)
-    if type:
-        query = query.eq("type", type)
-    result = query.execute()
-    return {"status": "success", "data": result.data}
+    """Get user's categories (cached briefly; writes invalidate)"""
+    categories = get_cached_categories(user_id, type)
+    if categories is None:
+        query = supabase_async.table("category").select("*").eq("user_id", user_id)
+        if type:
+            query = query.eq("type", type)
+        result = await query.execute()
+        categories = result.data
+        set_cached_categories(user_id, type, categories)
+    return ORJSONResponse({"status": "success", "data": categories})
 
 
 @router.post("")
@@ -29,18 +35,20 @@ async def create_category(request: CategoryRequest, user_id: str = Query(None)):
     if not final_user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
 
-    result = supabase.table("category").insert({
-        "name": request.name,
-        "type": request.type,
-        "user_id": final_user_id
-    }).execute()
+    # Request fields map 1:1 to the row (name, type, user_id)
+    row = request.model_dump()
+    row["user_id"] = final_user_id
+    result = await supabase_async.table("category").insert(row).execute()
+    invalidate_categories(final_user_id)
     return {"status": "success", "data": result.data[0] if result.data else None}
 
 
 @router.delete("/{category_id}")
 async def delete_category(category_id: int):
     """Delete category"""
-    result = supabase.table("category").delete().eq("id", category_id).execute()
+    result = await supabase_async.table("category").delete().eq("id", category_id).execute()
+    for row in result.data or []:
+        invalidate_categories(row.get("user_id"))
     if result.data:
         return {"status": "success", "message": "Category deleted"}
     return {"status": "error", "message": "Category not found"}
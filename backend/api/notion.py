@@ -2,26 +2,52 @@
 Notion OAuth and management endpoints.
 """
 
+import asyncio
 import base64
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import RedirectResponse
-from notion_client import Client as NotionClient
+from fastapi.responses import ORJSONResponse, RedirectResponse
+from notion_client.errors import APIErrorCode, APIResponseError
 
 from database import (
-    supabase,
+    http_client,
+    supabase_async,
     NOTION_CLIENT_ID,
     NOTION_CLIENT_SECRET,
     NOTION_REDIRECT_URI,
 )
 from models.schemas import CreateDatabaseRequest
+from helpers.notion_helpers import get_notion_client, get_user_notion, notion_call
 
 
+logger = logging.getLogger(__name__)
+
 # OAuth constants
 NOTION_AUTH_URL = "https://api.notion.com/v1/oauth/authorize"
 NOTION_TOKEN_URL = "https://api.notion.com/v1/oauth/token"
 
+# Title match for an existing One Gate database ("One Gate", "one gate", "OneGate", ...)
+_ONE_GATE_RE = re.compile(r"one\s*gate", re.IGNORECASE)
+
+# Background token refresh
+TOKEN_REFRESH_INTERVAL = 60  # seconds between scans
+TOKEN_REFRESH_WINDOW = 300  # refresh tokens expiring within 5 minutes
+TOKEN_REFRESH_CONCURRENCY = 10
+
+# Cache for /notion/auth/status per user (30-second TTL); saves the users
+# lookup and the users.me call on every frontend poll
+_auth_status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+AUTH_STATUS_CACHE_TTL = 30
+AUTH_STATUS_CACHE_SIZE = 1024
+# users.me error codes that mean the stored token itself is bad (cached as "expired")
+_INVALID_TOKEN_CODES = (APIErrorCode.Unauthorized, APIErrorCode.RestrictedResource)
+
 
 # ============================================================
 # Notion Router - Single unified router for all Notion endpoints
@@ -33,6 +59,116 @@ router = APIRouter(prefix="/notion", tags=["Notion"])
 legacy_auth_router = APIRouter(prefix="/auth/notion", tags=["Notion OAuth Legacy"])
 
 
+# ============================================================
+# OAuth Token Helpers
+# ============================================================
+
+def _basic_auth_header() -> str:
+    """Build the Basic auth header for Notion's OAuth token endpoint."""
+    credentials = f"{NOTION_CLIENT_ID}:{NOTION_CLIENT_SECRET}"
+    return f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+
+# Client credentials are fixed at startup, so the headers are built once
+_TOKEN_REQUEST_HEADERS = {
+    "Authorization": _basic_auth_header(),
+    "Content-Type": "application/json",
+}
+
+
+def _cache_auth_status(user_id: str, status: Dict[str, Any]) -> Dict[str, Any]:
+    if len(_auth_status_cache) >= AUTH_STATUS_CACHE_SIZE:
+        _auth_status_cache.clear()  # entries are short-lived; revalidating is cheap
+    _auth_status_cache[user_id] = (time.monotonic(), status)
+    return status
+
+
+def _invalidate_auth_status(user_id: str) -> None:
+    """Drop the cached status after the user's token changes."""
+    _auth_status_cache.pop(user_id, None)
+
+
+def _token_update_fields(token_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a Notion token response to users table columns.
+
+    The refresh token is only replaced when Notion returns one. Without
+    expires_in the expiry is cleared, so the refresher stops picking the user up.
+    """
+    fields = {"notion_access_token": token_data.get("access_token"), "notion_expires_at": None}
+    if token_data.get("refresh_token"):
+        fields["notion_refresh_token"] = token_data["refresh_token"]
+    if token_data.get("expires_in"):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(token_data["expires_in"]))
+        fields["notion_expires_at"] = expires_at.isoformat()
+    return fields
+
+
+async def _refresh_notion_token(user: Dict[str, Any], semaphore: asyncio.Semaphore) -> None:
+    """Refresh a single user's Notion access token and store the result."""
+    async with semaphore:
+        # Shared client - keeps the connection to api.notion.com alive across refreshes
+        response = await http_client.post(
+            NOTION_TOKEN_URL,
+            headers=_TOKEN_REQUEST_HEADERS,
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": user["notion_refresh_token"],
+            },
+        )
+
+        if response.status_code != 200:
+            logger.warning("[Notion Refresh] Token refresh failed for %s: %s", user["id"], response.text)
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                # Rejected grant (invalid_grant etc.) - retrying every scan can't succeed.
+                # The access token is left alone; /auth/status reports it once it stops working.
+                await supabase_async.table("users")\
+                    .update({"notion_refresh_token": None, "notion_expires_at": None})\
+                    .eq("id", user["id"])\
+                    .execute()
+            return
+
+        fields = _token_update_fields(response.json())
+        await supabase_async.table("users").update(fields).eq("id", user["id"]).execute()
+        _invalidate_auth_status(user["id"])
+
+
+async def refresh_expiring_notion_tokens() -> None:
+    """
+    Background loop that refreshes Notion tokens before they expire.
+
+    - Scans users whose token expires within TOKEN_REFRESH_WINDOW
+    - Refreshes them in parallel (bounded by TOKEN_REFRESH_CONCURRENCY)
+    - Keeps OAuth refresh latency off the request path
+    """
+    if not NOTION_CLIENT_ID or not NOTION_CLIENT_SECRET:
+        return
+
+    semaphore = asyncio.Semaphore(TOKEN_REFRESH_CONCURRENCY)
+    while True:
+        try:
+            cutoff = datetime.now(timezone.utc) + timedelta(seconds=TOKEN_REFRESH_WINDOW)
+            result = await supabase_async.table("users")\
+                .select("id, notion_refresh_token")\
+                .not_.is_("notion_refresh_token", "null")\
+                .lte("notion_expires_at", cutoff.isoformat())\
+                .execute()
+            users = result.data or []
+            if users:
+                outcomes = await asyncio.gather(
+                    *(_refresh_notion_token(user, semaphore) for user in users),
+                    return_exceptions=True,
+                )
+                for user, outcome in zip(users, outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.error("[Notion Refresh] Error for %s: %s", user["id"], outcome)
+                logger.info("[Notion Refresh] Processed %d expiring tokens", len(users))
+        except Exception as e:
+            logger.error("[Notion Refresh] Scan error: %s", e)
+
+        await asyncio.sleep(TOKEN_REFRESH_INTERVAL)
+
+
 @router.get("/auth")
 async def notion_auth(user_id: str):
     """
@@ -52,7 +188,7 @@ async def notion_auth(user_id: str):
         f"&redirect_uri={NOTION_REDIRECT_URI}"
         f"&state={user_id}"
     )
-    return {"auth_url": auth_url}
+    return ORJSONResponse({"auth_url": auth_url})
 
 
 @router.get("/auth/callback")
@@ -70,55 +206,43 @@ async def notion_callback(code: str = Query(...), state: str = Query(...)):
     user_id = state
 
     try:
-        credentials = f"{NOTION_CLIENT_ID}:{NOTION_CLIENT_SECRET}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                NOTION_TOKEN_URL,
-                headers={
-                    "Authorization": f"Basic {encoded_credentials}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": NOTION_REDIRECT_URI,
-                },
-            )
+        response = await http_client.post(
+            NOTION_TOKEN_URL,
+            headers=_TOKEN_REQUEST_HEADERS,
+            json={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": NOTION_REDIRECT_URI,
+            },
+        )
 
         if response.status_code != 200:
-            print(f"[Notion OAuth] Token error: {response.text}")
+            logger.warning("[Notion OAuth] Token error: %s", response.text)
             raise HTTPException(status_code=400, detail="Failed to get access token")
 
         token_data = response.json()
-        access_token = token_data.get("access_token")
         workspace_name = token_data.get("workspace_name")
 
-        print(f"[Notion OAuth] Success - Workspace: {workspace_name}")
+        logger.info("[Notion OAuth] Success - Workspace: %s", workspace_name)
 
-        result = supabase.table("users").update({"notion_access_token": access_token}).eq("id", user_id).execute()
+        result = await supabase_async.table("users").update(_token_update_fields(token_data)).eq("id", user_id).execute()
+        _invalidate_auth_status(user_id)
         if not result.data:
-            print(f"[Notion OAuth] User not found: {user_id}")
+            logger.warning("[Notion OAuth] User not found: %s", user_id)
 
         return RedirectResponse(url=f"http://localhost:5173?notion_connected=true&workspace={workspace_name}")
 
     except httpx.HTTPError as e:
-        print(f"[Notion OAuth] HTTP Error: {e}")
+        logger.error("[Notion OAuth] HTTP Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        print(f"[Notion OAuth] Error: {e}")
+        logger.error("[Notion OAuth] Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # Legacy callback endpoint for Notion OAuth redirect_uri compatibility
-@legacy_auth_router.get("/callback")
-async def notion_callback_legacy(code: str = Query(...), state: str = Query(...)):
-    """
-    Legacy OAuth callback endpoint.
-    Notion redirect_uri is set to /auth/notion/callback
-    """
-    return await notion_callback(code, state)
+# (Notion redirect_uri is set to /auth/notion/callback) - same handler, no wrapper
+legacy_auth_router.add_api_route("/callback", notion_callback, methods=["GET"], name="notion_callback_legacy")
 
 
 @router.get("/auth/status")
@@ -129,36 +253,44 @@ async def notion_auth_status(user_id: str):
     - Returns connection status (connected/not_connected/expired)
     - Validates token by calling Notion API
     - Returns user info if connected
+    - Results are cached for AUTH_STATUS_CACHE_TTL; transient Notion failures
+      (timeouts, 5xx, rate limits) return an uncached error instead
     """
+    entry = _auth_status_cache.get(user_id)
+    if entry and time.monotonic() - entry[0] < AUTH_STATUS_CACHE_TTL:
+        return ORJSONResponse(entry[1])
+
     try:
-        result = supabase.table("users")\
-            .select("notion_access_token, notion_database_id")\
-            .eq("id", user_id)\
-            .single()\
-            .execute()
+        user_data = await get_user_notion(user_id)
 
-        print(f"[Notion Status] User {user_id}: token={'있음' if result.data and result.data.get('notion_access_token') else '없음'}")
+        logger.info(
+            "[Notion Status] User %s: token=%s",
+            user_id,
+            "있음" if user_data and user_data.get("notion_access_token") else "없음",
+        )
 
-        if result.data and result.data.get("notion_access_token"):
-            token = result.data["notion_access_token"]
+        if user_data and user_data.get("notion_access_token"):
+            token = user_data["notion_access_token"]
             try:
-                notion_client = NotionClient(auth=token)
-                user_info = notion_client.users.me()
-                print(f"[Notion Status] API 호출 성공: {user_info.get('name')}")
-                return {
+                notion_client = get_notion_client(token)
+                user_info = await notion_call(notion_client.users.me)
+                logger.info("[Notion Status] API 호출 성공: %s", user_info.get("name"))
+                return ORJSONResponse(_cache_auth_status(user_id, {
                     "status": "connected",
                     "user": user_info.get("name"),
                     "bot_id": user_info.get("bot", {}).get("owner", {}).get("user", {}).get("id"),
-                }
-            except Exception as e:
-                print(f"[Notion Status] 토큰 검증 실패: {e}")
-                return {"status": "expired", "message": "Token expired or invalid"}
+                }))
+            except APIResponseError as e:
+                if e.code not in _INVALID_TOKEN_CODES:
+                    raise
+                logger.warning("[Notion Status] 토큰 검증 실패: %s", e)
+                return ORJSONResponse(_cache_auth_status(user_id, {"status": "expired", "message": "Token expired or invalid"}))
 
-        return {"status": "not_connected"}
+        return ORJSONResponse(_cache_auth_status(user_id, {"status": "not_connected"}))
 
     except Exception as e:
-        print(f"[Notion Status] Error: {e}")
-        return {"status": "error", "message": str(e)}
+        logger.error("[Notion Status] Error: %s", e)
+        return ORJSONResponse({"status": "error", "message": str(e)})
 
 
 @router.delete("/auth/disconnect")
@@ -166,23 +298,27 @@ async def notion_disconnect(user_id: str):
     """
     Disconnect Notion integration.
 
-    - Removes both access token and database ID
+    - Removes the access and refresh tokens and the database ID
     - Requires re-authentication to reconnect
     """
     try:
-        result = supabase.table("users")\
+        result = await supabase_async.table("users")\
             .update({
                 "notion_access_token": None,
-                "notion_database_id": None
+                "notion_database_id": None,
+                # Otherwise the background refresher would reconnect the user
+                "notion_refresh_token": None,
+                "notion_expires_at": None,
             })\
             .eq("id", user_id)\
             .execute()
+        _invalidate_auth_status(user_id)
 
         if result.data:
             return {"status": "success", "message": "Notion disconnected"}
         return {"status": "error", "message": "User not found"}
     except Exception as e:
-        print(f"[Notion Disconnect] Error: {e}")
+        logger.error("[Notion Disconnect] Error: %s", e)
         return {"status": "error", "message": str(e)}
 
 
@@ -192,36 +328,39 @@ async def notion_disconnect(user_id: str):
 
 
 @router.get("/pages")
-async def get_notion_pages(user_id: str):
+async def get_notion_pages(
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+):
     """
     Get list of accessible Notion pages.
 
     - Used for selecting parent page when creating database
     - Returns page title, icon, and URL
+    - Paginated: pass next_cursor from the previous response as cursor
+    - Defaults to Notion's maximum page size (100); clients may ask for less
     - Requires user's OAuth token
     """
-    print(f"[Notion Pages] Fetching pages for user: {user_id}")
+    logger.info("[Notion Pages] Fetching pages for user: %s", user_id)
     try:
-        user_result = supabase.table("users")\
-            .select("notion_access_token")\
-            .eq("id", user_id)\
-            .single()\
-            .execute()
+        user_data = await get_user_notion(user_id)
 
-        if not user_result.data or not user_result.data.get("notion_access_token"):
-            print(f"[Notion Pages] No token found for user: {user_id}")
-            return {"status": "error", "message": "Notion not connected"}
+        if not user_data or not user_data.get("notion_access_token"):
+            logger.info("[Notion Pages] No token found for user: %s", user_id)
+            return ORJSONResponse({"status": "error", "message": "Notion not connected"})
 
-        token = user_result.data["notion_access_token"]
-        print(f"[Notion Pages] Token found, length: {len(token)}")
-        user_notion = NotionClient(auth=token)
+        token = user_data["notion_access_token"]
+        logger.debug("[Notion Pages] Token found, length: %d", len(token))
+        user_notion = get_notion_client(token)
 
         # Search for pages
-        print("[Notion Pages] Searching for pages...")
-        search_result = user_notion.search(
-            filter={"property": "object", "value": "page"}
-        )
-        print(f"[Notion Pages] Search returned {len(search_result.get('results', []))} results")
+        logger.debug("[Notion Pages] Searching for pages...")
+        search_params = {"filter": {"property": "object", "value": "page"}, "page_size": limit}
+        if cursor:
+            search_params["start_cursor"] = cursor
+        search_result = await notion_call(user_notion.search, **search_params)
+        logger.debug("[Notion Pages] Search returned %d results", len(search_result.get("results", [])))
 
         pages = []
         for page in search_result.get("results", []):
@@ -248,14 +387,17 @@ async def get_notion_pages(user_id: str):
                 "url": page.get("url")
             })
 
-        print(f"[Notion Pages] Returning {len(pages)} pages")
-        return {"status": "success", "data": pages}
+        logger.info("[Notion Pages] Returning %d pages", len(pages))
+        return ORJSONResponse({
+            "status": "success",
+            "data": pages,
+            "next_cursor": search_result.get("next_cursor"),
+            "has_more": search_result.get("has_more", False),
+        })
 
     except Exception as e:
-        print(f"[Notion Pages] Error: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"status": "error", "message": str(e)}
+        logger.exception("[Notion Pages] Error: %s: %s", type(e).__name__, e)
+        return ORJSONResponse({"status": "error", "message": str(e)})
 
 
 @router.post("/setup-database")
@@ -268,37 +410,46 @@ async def setup_notion_database(request: CreateDatabaseRequest):
     - Saves database ID to user's record
     """
     try:
-        user_result = supabase.table("users")\
-            .select("notion_access_token")\
-            .eq("id", request.user_id)\
-            .single()\
-            .execute()
+        user_data = await get_user_notion(request.user_id)
 
-        if not user_result.data or not user_result.data.get("notion_access_token"):
+        if not user_data or not user_data.get("notion_access_token"):
             return {"status": "error", "message": "Notion not connected"}
 
-        token = user_result.data["notion_access_token"]
-        user_notion = NotionClient(auth=token)
+        token = user_data["notion_access_token"]
+        current_db_id = user_data.get("notion_database_id")
+        user_notion = get_notion_client(token)
 
         # 1. Search for existing "One Gate" database in page
         existing_db = None
         try:
-            children = user_notion.blocks.children.list(block_id=request.parent_page_id)
-            for block in children.get("results", []):
-                if block.get("type") == "child_database":
-                    # Check database title
-                    db_id = block["id"]
-                    db_info = user_notion.databases.retrieve(db_id)
-                    db_title = ""
-                    if db_info.get("title"):
-                        db_title = db_info["title"][0]["text"]["content"] if db_info["title"] else ""
-
-                    # Find database with "One Gate" in title
-                    if "One Gate" in db_title or "one gate" in db_title.lower():
-                        existing_db = db_info
-                        break
+            children = await notion_call(user_notion.blocks.children.list, block_id=request.parent_page_id)
+            child_db_ids = [
+                block["id"] for block in children.get("results", [])
+                if block.get("type") == "child_database"
+            ]
+
+            # Retrieve child databases concurrently (bounded by notion_call).
+            # One inaccessible database (e.g. a linked view) must not hide the others.
+            db_infos = await asyncio.gather(
+                *(notion_call(user_notion.databases.retrieve, db_id) for db_id in child_db_ids),
+                return_exceptions=True,
+            )
+            # Results keep block order, so the first match wins as before
+            for db_id, db_info in zip(child_db_ids, db_infos):
+                if isinstance(db_info, BaseException):
+                    logger.warning("[Notion] Skipping child database %s: %s", db_id, db_info)
+                    continue
+                # Check database title
+                db_title = ""
+                if db_info.get("title"):
+                    db_title = db_info["title"][0]["text"]["content"] if db_info["title"] else ""
+
+                # Find database with "One Gate" in title
+                if _ONE_GATE_RE.search(db_title):
+                    existing_db = db_info
+                    break
         except Exception as e:
-            print(f"[Notion] Error searching child blocks (ignored): {e}")
+            logger.warning("[Notion] Error searching child blocks (ignored): %s", e)
 
         # 2. If database exists, connect to it
         if existing_db:
@@ -306,13 +457,14 @@ async def setup_notion_database(request: CreateDatabaseRequest):
             db_url = existing_db["url"]
             db_title = existing_db["title"][0]["text"]["content"] if existing_db.get("title") else "One Gate 메모"
 
-            # Save database ID to user record
-            supabase.table("users")\
-                .update({"notion_database_id": db_id})\
-                .eq("id", request.user_id)\
-                .execute()
+            # Save database ID to user record (skip the write if already connected)
+            if current_db_id != db_id:
+                await supabase_async.table("users")\
+                    .update({"notion_database_id": db_id})\
+                    .eq("id", request.user_id)\
+                    .execute()
 
-            print(f"[Notion] Existing database connected: {db_url}")
+            logger.info("[Notion] Existing database connected: %s", db_url)
 
             return {
                 "status": "success",
@@ -324,7 +476,8 @@ async def setup_notion_database(request: CreateDatabaseRequest):
             }
 
         # 3. Create new database
-        new_db = user_notion.databases.create(
+        new_db = await notion_call(
+            user_notion.databases.create,
             parent={"type": "page_id", "page_id": request.parent_page_id},
             title=[{"type": "text", "text": {"content": request.database_name}}],
             icon={"type": "emoji", "emoji": "⚡"},
@@ -365,12 +518,12 @@ async def setup_notion_database(request: CreateDatabaseRequest):
         db_url = new_db["url"]
 
         # Save database ID to user record
-        supabase.table("users")\
+        await supabase_async.table("users")\
             .update({"notion_database_id": db_id})\
             .eq("id", request.user_id)\
             .execute()
 
-        print(f"[Notion] Database created: {db_url}")
+        logger.info("[Notion] Database created: %s", db_url)
 
         return {
             "status": "success",
@@ -382,7 +535,7 @@ async def setup_notion_database(request: CreateDatabaseRequest):
         }
 
     except Exception as e:
-        print(f"[Notion Setup DB] Error: {e}")
+        logger.error("[Notion Setup DB] Error: %s", e)
         return {"status": "error", "message": str(e)}
 
 
@@ -395,28 +548,24 @@ async def get_notion_database_status(user_id: str):
     - If ready, returns database info including name and parent page
     """
     try:
-        user_result = supabase.table("users")\
-            .select("notion_access_token, notion_database_id")\
-            .eq("id", user_id)\
-            .single()\
-            .execute()
+        user_data = await get_user_notion(user_id)
 
-        if not user_result.data:
-            return {"status": "error", "message": "User not found"}
+        if not user_data:
+            return ORJSONResponse({"status": "error", "message": "User not found"})
 
-        token = user_result.data.get("notion_access_token")
-        db_id = user_result.data.get("notion_database_id")
+        token = user_data.get("notion_access_token")
+        db_id = user_data.get("notion_database_id")
 
         if not token:
-            return {"status": "not_connected"}
+            return ORJSONResponse({"status": "not_connected"})
 
         if not db_id:
-            return {"status": "no_database", "message": "데이터베이스를 선택해주세요"}
+            return ORJSONResponse({"status": "no_database", "message": "데이터베이스를 선택해주세요"})
 
         # Retrieve database info
         try:
-            user_notion = NotionClient(auth=token)
-            db_info = user_notion.databases.retrieve(db_id)
+            user_notion = get_notion_client(token)
+            db_info = await notion_call(user_notion.databases.retrieve, db_id)
 
             db_title = "One Gate 메모"
             if db_info.get("title"):
@@ -427,7 +576,7 @@ async def get_notion_database_status(user_id: str):
             parent = db_info.get("parent", {})
             if parent.get("type") == "page_id":
                 try:
-                    parent_page = user_notion.pages.retrieve(parent["page_id"])
+                    parent_page = await notion_call(user_notion.pages.retrieve, parent["page_id"])
                     # Extract page title
                     if parent_page.get("properties"):
                         for prop in parent_page["properties"].values():
@@ -437,17 +586,17 @@ async def get_notion_database_status(user_id: str):
                 except Exception:
                     pass
 
-            return {
+            return ORJSONResponse({
                 "status": "ready",
                 "database_id": db_id,
                 "database_name": db_title,
                 "page_name": page_name,
                 "url": db_info.get("url")
-            }
+            })
         except Exception:
             # Database deleted or inaccessible
-            return {"status": "database_invalid", "message": "데이터베이스에 접근할 수 없습니다"}
+            return ORJSONResponse({"status": "database_invalid", "message": "데이터베이스에 접근할 수 없습니다"})
 
     except Exception as e:
-        print(f"[Notion DB Status] Error: {e}")
-        return {"status": "error", "message": str(e)}
+        logger.error("[Notion DB Status] Error: %s", e)
+        return ORJSONResponse({"status": "error", "message": str(e)})
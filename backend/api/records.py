@@ -9,30 +9,57 @@ This module handles:
 """
 
 import asyncio
+import logging
+import re
 import uuid
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, List
 
-from fastapi import APIRouter, Header, HTTPException, Form, File, UploadFile, BackgroundTasks, Request, Query
-from fastapi.responses import StreamingResponse
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from notion_client import Client as NotionClient
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Form, File, UploadFile, BackgroundTasks, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from database import supabase
+from database import supabase_async
 from models.schemas import AIAnalysisData, UpdateRecordRequest, UploadRequest
 from helpers.ai_helpers import _run_ai_analysis
-from helpers.calendar_helpers import _convert_recurrence_to_rrule
+from helpers.db_helpers import inputs_batcher
+from helpers.date_utils import _iso_now
+from helpers.calendar_helpers import (
+    _convert_recurrence_to_rrule,
+    insert_google_calendar_event,
+    resolve_calendar_id,
+)
 from helpers.notion_helpers import (
+    get_notion_client,
+    create_notion_page,
+    get_user_notion,
+    notion_call,
     get_notion_properties_cached,
-    add_notion_property,
-    _notion_property_cache,
+    add_notion_properties,
+    set_notion_properties_cached,
     build_notion_page_blocks,
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/records", tags=["Records"])
 
+# SSE keepalive interval (seconds)
+SSE_PING_INTERVAL = 15
+
+# Columns the record list view needs (result drives card summary/category and bulk upload)
+RECORD_LIST_COLUMNS = "id, type, text, image_url, status, result, created_at, category(id, name, type)"
+
+# Initial type guess for a new record (AI analysis sets the real type); one pass over the text
+_INITIAL_CALENDAR_RE = re.compile("내일|시|일정")
+
+# /records page size (default and upper bound for ?limit=)
+RECORD_PAGE_SIZE = 100
+RECORD_PAGE_SIZE_MAX = 500
+# Rows encoded per chunk when streaming the /records body
+RECORD_STREAM_BATCH = 100
+
 
 # Import _broker from main at module level
 # This is safe because main.py defines _broker before importing this module
@@ -42,6 +69,45 @@ def get_broker():
     return _broker
 
 
+async def _upload_image(file_name: str, image_bytes: bytes, image_mime_type: str) -> str:
+    """Upload image to Supabase Storage (bucket: images) and return its public URL."""
+    bucket = supabase_async.storage.from_('images')
+    await bucket.upload(
+        path=file_name,
+        file=image_bytes,
+        file_options={"content-type": image_mime_type}
+    )
+    return await bucket.get_public_url(file_name)
+
+
+async def _attach_image_url(broker, record_id: int, user_id: str, upload: "asyncio.Future[str]") -> None:
+    """
+    Wait for the image upload started in analyze_content and attach its URL to the record.
+    Notify client via SSE (image_ready) when the URL is available.
+    """
+    try:
+        image_url = await upload
+
+        await supabase_async.table("inputs").update({
+            "image_url": image_url,
+        }).eq("id", record_id).execute()
+
+        await broker.publish(
+            str(user_id),
+            "image_ready",
+            {"record_id": record_id, "image_url": image_url},
+        )
+        logger.info("[분석] 이미지 업로드 완료: %s", image_url)
+    except Exception as e:
+        # AI analysis uses image_bytes directly, so a failed upload only loses the stored copy
+        logger.warning("[분석] 이미지 업로드 오류: %s", e)
+
+
+async def _run_concurrently(*jobs) -> None:
+    """Await background coroutines together (BackgroundTasks would run them one after another)."""
+    await asyncio.gather(*jobs)
+
+
 @router.post("/analyze")
 async def analyze_content(
     background_tasks: BackgroundTasks,
@@ -57,72 +123,57 @@ async def analyze_content(
     - Accepts FormData with user_id, text (optional), and image (optional)
     - memo_categories: JSON string array of user's MEMO categories
     - calendar_categories: JSON string array of user's CALENDAR categories
-    - Uploads image to Supabase Storage
-    - Saves record with PENDING status
+    - Saves record with PENDING status (image_url is filled in later)
     - Publishes record_created SSE event immediately
+    - Uploads image to Supabase Storage concurrently with the insert (image_ready SSE event)
     - Triggers background AI analysis
     - Returns record data immediately without waiting for analysis
     """
     display_text = text[:30] if text else "(이미지만)"
-    print(f"[분석] user_id: {user_id}, 내용: {display_text}..., 이미지: {'있음' if image else '없음'}")
+    logger.info("[분석] user_id: %s, 내용: %s..., 이미지: %s", user_id, display_text, "있음" if image else "없음")
 
-    # Process image
-    image_url = None
+    # Process image (storage upload starts before the insert and finishes in the background)
     image_bytes = None
     image_mime_type = None
+    file_name = None
 
     if image:
         try:
-            # Read image bytes for AI analysis
+            # Read image bytes once - the same buffer feeds AI analysis and the storage upload
             image_bytes = await image.read()
             image_mime_type = image.content_type or "image/jpeg"
 
             # Generate file name: user_id/timestamp_uuid.ext
             file_ext = image.filename.split('.')[-1] if '.' in image.filename else 'png'
-            file_name = f"{user_id}/{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{file_ext}"
-
-            # Upload to Supabase Storage (bucket: images)
-            storage_response = supabase.storage.from_('images').upload(
-                path=file_name,
-                file=image_bytes,
-                file_options={"content-type": image_mime_type}
-            )
-
-            # Get public URL for database storage
-            image_url = supabase.storage.from_('images').get_public_url(file_name)
-            print(f"[분석] 이미지 업로드 완료: {image_url}")
-
+            file_name = f"{user_id}/{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.{file_ext}"
         except Exception as e:
-            print(f"[분석] 이미지 업로드 오류: {e}")
-            # Continue with AI analysis even if upload fails (image_bytes already read)
-            if not image_bytes:
-                try:
-                    await image.seek(0)
-                    image_bytes = await image.read()
-                    image_mime_type = image.content_type or "image/jpeg"
-                except Exception as e2:
-                    print(f"[분석] 이미지 읽기 실패: {e2}")
+            logger.warning("[분석] 이미지 읽기 실패: %s", e)
+        finally:
+            # Release the spooled temp file now instead of after the background tasks finish
+            await image.close()
 
     # Require either text or image
     if not text and not image_bytes:
         raise HTTPException(status_code=400, detail="텍스트 또는 이미지가 필요합니다")
 
     # Initial type estimation (will be updated by AI analysis)
-    text_for_analysis = text or ""
-    is_calendar = "내일" in text_for_analysis or "시" in text_for_analysis or "일정" in text_for_analysis
+    is_calendar = text is not None and _INITIAL_CALENDAR_RE.search(text) is not None
     input_type = "CALENDAR" if is_calendar else "MEMO"
 
     input_data = {
         "user_id": user_id,
         "type": input_type,
         "text": text,
-        "image_url": image_url,
+        "image_url": None,
         "status": "PENDING",
     }
 
+    # Start the storage upload now so it overlaps the insert (URL is attached later)
+    upload = asyncio.ensure_future(_upload_image(file_name, image_bytes, image_mime_type)) if image_bytes else None
+
     try:
-        result = supabase.table("inputs").insert(input_data).execute()
-        record = result.data[0] if result.data else None
+        # Inserts arriving close together are sent as one batch request
+        record = await inputs_batcher.submit(input_data)
 
         if not record or record.get("id") is None:
             raise HTTPException(status_code=500, detail="레코드 생성 실패")
@@ -139,72 +190,93 @@ async def analyze_content(
                 "status": "PENDING",
                 "type": input_type,
                 "text": text,
-                "image_url": image_url,
+                "image_url": None,
+                "has_image": image_bytes is not None,
                 "created_at": record.get("created_at"),
             },
         )
 
-        # Start background AI analysis
-        background_tasks.add_task(
-            _run_ai_analysis,
-            broker,
-            record_id,
-            user_id,
-            text,
-            image_bytes,
-            image_mime_type,
-            memo_categories,
-            calendar_categories,
-        )
+        # Background AI analysis (uses image_bytes directly, doesn't wait for storage)
+        jobs = [
+            _run_ai_analysis(
+                broker,
+                record_id,
+                user_id,
+                text,
+                image_bytes,
+                image_mime_type,
+                memo_categories,
+                calendar_categories,
+            )
+        ]
+        # Attach the storage URL once the upload finishes (image_ready SSE event)
+        if upload is not None:
+            jobs.append(_attach_image_url(broker, record_id, user_id, upload))
 
-        return {
+        # A coroutine function, so Starlette awaits it on the event loop
+        background_tasks.add_task(_run_concurrently, *jobs)
+
+        # A response object is sent as-is - FastAPI skips its jsonable_encoder pass
+        return ORJSONResponse({
             "status": "success",
             "data": {
                 "id": record_id,
                 "type": input_type,
                 "text": text,
                 "has_image": image_bytes is not None,
-                "image_url": image_url,
+                "image_url": None,
                 "status": "PENDING",
                 "created_at": record.get("created_at"),
             },
-        }
+        })
     except HTTPException:
+        if upload is not None:
+            upload.cancel()
         raise
     except Exception as e:
+        if upload is not None:
+            upload.cancel()
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/stream")
-async def stream_records(user_id: str, request: Request):
+async def stream_records(user_id: str):
     """
     Server-Sent Events (SSE) stream for real-time record updates.
 
     - Subscribes to user-specific event queue
     - Sends connected event on connection
     - Sends ping events every 15 seconds for keepalive
-    - Handles client disconnection gracefully
-    - Events: connected, ping, record_created, analysis_completed, analysis_failed, record_updated
+    - Handles client disconnection gracefully (generator is cancelled on disconnect)
+    - Events: connected, ping, record_created, image_ready, analysis_completed, analysis_failed, record_updated
+    - resync: events were dropped for a slow client; refetch records
     """
     broker = get_broker()
     queue = await broker.subscribe(user_id)
 
     async def _event_generator():
+        # One pending queue.get() raced against a keepalive timer; only the
+        # finished one is re-armed. Client disconnect cancels this generator.
+        get_task = None
+        ping_task = None
         try:
-            yield "event: connected\ndata: {}\n\n"
+            yield b"event: connected\ndata: {}\n\n"
+            get_task = asyncio.ensure_future(queue.get())
+            ping_task = asyncio.ensure_future(asyncio.sleep(SSE_PING_INTERVAL))
             while True:
-                if await request.is_disconnected():
-                    break
-                try:
-                    message = await asyncio.wait_for(queue.get(), timeout=15)
-                    yield message
-                except asyncio.TimeoutError:
-                    yield "event: ping\ndata: {}\n\n"
-                except asyncio.CancelledError:
-                    break
+                done, _ = await asyncio.wait({get_task, ping_task}, return_when=asyncio.FIRST_COMPLETED)
+                if get_task in done:
+                    yield get_task.result()
+                    get_task = asyncio.ensure_future(queue.get())
+                if ping_task in done:
+                    yield b"event: ping\ndata: {}\n\n"
+                    ping_task = asyncio.ensure_future(asyncio.sleep(SSE_PING_INTERVAL))
         except asyncio.CancelledError:
             pass
         finally:
+            for task in (get_task, ping_task):
+                if task is not None:
+                    task.cancel()
             await broker.unsubscribe(user_id, queue)
 
     return StreamingResponse(
@@ -224,22 +296,11 @@ async def update_record(record_id: int, request: UpdateRecordRequest):
     - Updates type and status based on analysis_data
     - Publishes record_updated SSE event
     """
-    fetch = (
-        supabase.table("inputs").select("id,user_id,result").eq("id", record_id).limit(1).execute()
-    )
-    record = fetch.data[0] if fetch.data else None
-    if not record:
-        raise HTTPException(status_code=404, detail="Record not found")
-
-    user_id = record.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=400, detail="Record missing user_id")
-
     update_payload: Dict[str, Any] = {}
     if request.text is not None:
         update_payload["text"] = request.text
     if request.analysis_data is not None:
-        validated = AIAnalysisData(**request.analysis_data).model_dump(exclude_none=True)
+        validated = AIAnalysisData.model_validate(request.analysis_data).model_dump(exclude_none=True)
         update_payload["result"] = validated
         update_payload["type"] = validated["type"]
         update_payload["status"] = "ANALYZED"
@@ -247,9 +308,14 @@ async def update_record(record_id: int, request: UpdateRecordRequest):
     if not update_payload:
         return {"status": "success", "message": "No changes"}
 
-    updated = supabase.table("inputs").update(update_payload).eq("id", record_id).execute()
+    # UPDATE returns the row (return=representation), so no pre-fetch is needed
+    updated = await supabase_async.table("inputs").update(update_payload).eq("id", record_id).execute()
     if not updated.data:
-        raise HTTPException(status_code=500, detail="Failed to update record")
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    user_id = updated.data[0].get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="Record missing user_id")
 
     broker = get_broker()
     await broker.publish(
@@ -265,25 +331,82 @@ async def update_record(record_id: int, request: UpdateRecordRequest):
 
 
 @router.get("")
-async def get_records(user_id: str, status: Optional[str] = None):
+async def get_records(
+    user_id: str,
+    status: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(RECORD_PAGE_SIZE, ge=1, le=RECORD_PAGE_SIZE_MAX),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+):
     """
     Get user's records with optional status filter.
 
     - Filters by user_id and non-deleted records
     - Optional status filter (PENDING/ANALYZED/COMPLETED/CANCELED)
     - Joins with category table
+    - Returns list columns only (final_result etc. via /records/{id}/detail)
     - Returns records ordered by creation date (descending)
+    - Paginated with offset/limit (default 100 per page)
+    - Keyset paging: pass the last row's created_at/id as before/before_id to get
+      the next page (stable while new records are being created)
+    - Body is streamed in encoded chunks (same {"status", "data"} shape)
     """
     query = (
-        supabase.table("inputs")
-        .select("*, category(id, name, type)")
+        supabase_async.table("inputs")
+        .select(RECORD_LIST_COLUMNS)
         .eq("user_id", user_id)
         .is_("deleted_at", "null")
     )
     if status:
         query = query.eq("status", status)
-    result = query.order("created_at", desc=True).execute()
-    return {"status": "success", "data": result.data}
+    if before and before_id is not None:
+        # id breaks created_at ties (rows from one batched insert share a timestamp)
+        cursor = before.isoformat()
+        query = query.or_(f'created_at.lt."{cursor}",and(created_at.eq."{cursor}",id.lt.{before_id})')
+    elif before:
+        query = query.lt("created_at", before.isoformat())
+    # Served by idx_inputs_user_created (migrations/001_inputs_user_created_idx.sql)
+    result = await (
+        query.order("created_at", desc=True)
+        .order("id", desc=True)
+        .range(offset, offset + limit - 1)
+        .execute()
+    )
+    return StreamingResponse(_encode_records(result.data), media_type="application/json")
+
+
+def _encode_records(rows: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Encode {"status": "success", "data": rows} in RECORD_STREAM_BATCH-row chunks.
+
+    A sync generator on purpose: StreamingResponse iterates it in the threadpool,
+    so encoding a large page never runs on the event loop, and only one chunk
+    of encoded bytes is held at a time.
+    """
+    yield b'{"status":"success","data":['
+    for start in range(0, len(rows), RECORD_STREAM_BATCH):
+        chunk = b",".join(map(orjson.dumps, rows[start:start + RECORD_STREAM_BATCH]))
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+@router.get("/{record_id}/detail")
+async def get_record_detail(record_id: int):
+    """
+    Get a single record with all columns.
+
+    - Includes final_result and timestamps omitted from the list view
+    - Joins with category table
+    """
+    result = await supabase_async.table("inputs")\
+        .select("*, category(id, name, type)")\
+        .eq("id", record_id)\
+        .limit(1)\
+        .execute()
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return ORJSONResponse({"status": "success", "data": result.data[0]})
 
 
 @router.delete("/{record_id}")
@@ -295,9 +418,9 @@ async def delete_record(record_id: int):
     - Sets deleted_at timestamp
     - Does not physically delete from database
     """
-    result = (
-        supabase.table("inputs")
-        .update({"status": "CANCELED", "deleted_at": datetime.utcnow().isoformat()})
+    result = await (
+        supabase_async.table("inputs")
+        .update({"status": "CANCELED", "deleted_at": _iso_now()})
         .eq("id", record_id)
         .execute()
     )
@@ -332,19 +455,21 @@ async def upload_record(
     - Includes image and original text in page body
     - Uses user's notion_access_token and notion_database_id
     """
-    # 1. Fetch record
-    fetch = supabase.table("inputs").select("*").eq("id", record_id).limit(1).execute()
-    record = fetch.data[0] if fetch.data else None
+    # 1. Fetch record, only if ANALYZED (with final_data: save it to final_result in the same request)
+    if request.final_data:
+        query = supabase_async.table("inputs").update({"final_result": request.final_data})
+    else:
+        query = supabase_async.table("inputs").select("*")
+    claimed = await query.eq("id", record_id).eq("status", "ANALYZED").execute()
+    record = claimed.data[0] if claimed.data else None
     if not record:
-        raise HTTPException(status_code=404, detail="Record not found")
-
-    if record.get("status") != "ANALYZED":
+        exists = await supabase_async.table("inputs").select("id").eq("id", record_id).limit(1).execute()
+        if not exists.data:
+            raise HTTPException(status_code=404, detail="Record not found")
         raise HTTPException(status_code=400, detail="Only ANALYZED records can be uploaded")
 
-    # 2. Save final_data to final_result if provided
+    # 2. Use final_data if provided
     upload_data = request.final_data if request.final_data else record.get("result", {})
-    if request.final_data:
-        supabase.table("inputs").update({"final_result": request.final_data}).eq("id", record_id).execute()
 
     record_type = upload_data.get("type") or record.get("type")
 
@@ -359,22 +484,16 @@ async def upload_record(
             description = upload_data.get("content") or ""
 
             # Time fallback
-            fallback_start = datetime.utcnow().replace(hour=14, minute=0, second=0, microsecond=0)
+            fallback_start = datetime.now(timezone.utc).replace(hour=14, minute=0, second=0, microsecond=0, tzinfo=None)
             fallback_end = fallback_start.replace(hour=15)
             start_time = upload_data.get("start_time") or fallback_start.isoformat()
             end_time = upload_data.get("end_time") or fallback_end.isoformat()
 
-            creds = Credentials(token=google_token)
-            service = build("calendar", "v3", credentials=creds)
-
-            calendar_id = "primary"
-            calendar_name = upload_data.get("category")
-            if calendar_name:
-                calendar_list = service.calendarList().list().execute()
-                for cal in calendar_list.get("items", []):
-                    if cal.get("summary") == calendar_name:
-                        calendar_id = cal.get("id")
-                        break
+            calendar_id = await resolve_calendar_id(
+                record.get("user_id"),
+                google_token,
+                upload_data.get("category"),
+            )
 
             event_body = {
                 "summary": summary,
@@ -391,7 +510,7 @@ async def upload_record(
             if recurrence:
                 event_body["recurrence"] = recurrence
 
-            event = service.events().insert(calendarId=calendar_id, body=event_body).execute()
+            event = await insert_google_calendar_event(google_token, calendar_id, event_body)
             upload_result = {"type": "calendar", "link": event.get("htmlLink"), "event_id": event.get("id")}
 
         else:  # MEMO → Notion
@@ -400,18 +519,24 @@ async def upload_record(
             if not user_id:
                 raise HTTPException(status_code=400, detail="Record has no user_id")
 
-            # Fetch user's Notion credentials
-            user_result = supabase.table("users")\
-                .select("notion_access_token, notion_database_id")\
-                .eq("id", user_id)\
-                .single()\
-                .execute()
+            # Fetch user's Notion credentials; build the page body while the query is in flight
+            user_fetch = asyncio.ensure_future(get_user_notion(user_id))
+
+            # AIAnalysisData → MemoData mapping
+            title = upload_data.get("summary") or record.get("text", "")[:100]
+            content = upload_data.get("content") or record.get("text", "")
+            category = upload_data.get("category") or "아이디어"
+
+            # Build page body blocks (image + analysis + original text)
+            children_blocks = build_notion_page_blocks(record, upload_data)
+
+            user_data = await user_fetch
 
-            if not user_result.data:
+            if not user_data:
                 raise HTTPException(status_code=404, detail="User not found")
 
-            notion_token = user_result.data.get("notion_access_token")
-            notion_db_id = user_result.data.get("notion_database_id")
+            notion_token = user_data.get("notion_access_token")
+            notion_db_id = user_data.get("notion_database_id")
 
             # Check if user has connected Notion
             if not notion_token:
@@ -427,55 +552,45 @@ async def upload_record(
                 )
 
             # Create user-specific Notion client
-            user_notion = NotionClient(auth=notion_token)
-
-            # AIAnalysisData → MemoData mapping
-            title = upload_data.get("summary") or record.get("text", "")[:100]
-            content = upload_data.get("content") or record.get("text", "")
-            category = upload_data.get("category") or "아이디어"
+            user_notion = get_notion_client(notion_token)
 
             # Detect or create required properties
-            props_info = get_notion_properties_cached(user_notion, notion_db_id)
+            props_info = await notion_call(get_notion_properties_cached, user_notion, notion_db_id)
 
-            # If Category property doesn't exist, add it
+            # Collect missing properties and add them in one databases.update
+            missing_properties = {}
             if props_info["needs_category"]:
+                missing_properties["Category"] = {
+                    "select": {
+                        "options": [
+                            {"name": "아이디어", "color": "blue"},
+                            {"name": "할 일", "color": "green"},
+                            {"name": "메모", "color": "yellow"},
+                            {"name": "일정", "color": "red"},
+                            {"name": "기타", "color": "gray"}
+                        ]
+                    }
+                }
+
+            if missing_properties:
                 try:
-                    add_notion_property(
-                        user_notion,
-                        notion_db_id,
-                        "Category",
-                        {
-                            "select": {
-                                "options": [
-                                    {"name": "아이디어", "color": "blue"},
-                                    {"name": "할 일", "color": "green"},
-                                    {"name": "메모", "color": "yellow"},
-                                    {"name": "일정", "color": "red"},
-                                    {"name": "기타", "color": "gray"}
-                                ]
-                            }
-                        }
-                    )
-                    print(f"[Notion] Added 'Category' property to database {notion_db_id}")
-                    # Invalidate cache so next call detects the new property
-                    if notion_db_id in _notion_property_cache:
-                        del _notion_property_cache[notion_db_id]
-                    props_info = get_notion_properties_cached(user_notion, notion_db_id)
+                    await notion_call(add_notion_properties, user_notion, notion_db_id, missing_properties)
+                    logger.info("[Notion] Added %s properties to database %s", list(missing_properties), notion_db_id)
+                    # Property names are known now - patch the cached schema instead of re-fetching it
+                    props_info = {**props_info, "needs_category": False, "category_property": "Category"}
+                    await asyncio.to_thread(set_notion_properties_cached, notion_db_id, props_info)
                 except Exception as e:
-                    print(f"[Notion] Failed to add Category property: {e}")
+                    logger.warning("[Notion] Failed to add properties: %s", e)
                     # Continue anyway, might fail at page creation
 
             # Create page with detected property names
-            print(f"[Upload] Starting Notion upload for record {record_id}")
-            print(f"[Upload] User: {user_id}, DB: {notion_db_id}")
-            print(f"[Upload] Title: {title}, Category: {category}")
+            logger.info("[Upload] Starting Notion upload for record %s", record_id)
+            logger.debug("[Upload] User: %s, DB: %s", user_id, notion_db_id)
+            logger.debug("[Upload] Title: %s, Category: %s", title, category)
 
-            # Build page body blocks (image + analysis + original text)
-            children_blocks = build_notion_page_blocks(record, upload_data)
-
-            page = user_notion.pages.create(
-                parent={"database_id": notion_db_id},
-                properties={
+            page = await create_notion_page(notion_token, {
+                "parent": {"database_id": notion_db_id},
+                "properties": {
                     props_info["title_property"]: {
                         "title": [{"type": "text", "text": {"content": title}}]
                     },
@@ -483,22 +598,23 @@ async def upload_record(
                         "select": {"name": category}
                     },
                 },
-                children=children_blocks,
-            )
+                "children": children_blocks,
+            })
             upload_result = {"type": "notion", "page_id": page.get("id"), "url": page.get("url")}
 
             # Validate page was actually created
             if not page.get("id") or not page.get("url"):
                 raise ValueError("Notion page creation returned no ID or URL")
 
-            print(f"[Upload] Notion page created: {page.get('id')}")
-            print(f"[Upload] Notion URL: {page.get('url')}")
+            logger.info("[Upload] Notion page created: %s", page.get("id"))
+            logger.debug("[Upload] Notion URL: %s", page.get("url"))
 
         # 4. Mark as completed on success
-        supabase.table("inputs").update({
+        now = _iso_now()
+        await supabase_async.table("inputs").update({
             "status": "COMPLETED",
-            "completed_at": datetime.utcnow().isoformat(),
-            "deleted_at": datetime.utcnow().isoformat(),
+            "completed_at": now,
+            "deleted_at": now,
         }).eq("id", record_id).execute()
 
         # 5. Publish SSE event for frontend update
@@ -512,7 +628,7 @@ async def upload_record(
                 "upload_result": upload_result
             }
         )
-        print(f"[Upload] SSE event published for record {record_id}")
+        logger.debug("[Upload] SSE event published for record %s", record_id)
 
         return {"status": "success", "data": upload_result}
 
@@ -520,9 +636,7 @@ async def upload_record(
         raise
     except Exception as e:
         # On failure, keep status as ANALYZED (final_result already saved)
-        print(f"[Upload] Failed for record {record_id}: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[Upload] Failed for record %s: %s: %s", record_id, type(e).__name__, e)
 
         # Publish SSE event on failure
         try:
@@ -536,8 +650,8 @@ async def upload_record(
                     "error": str(e)
                 }
             )
-            print(f"[Upload] SSE failure event published for record {record_id}")
+            logger.debug("[Upload] SSE failure event published for record %s", record_id)
         except Exception as sse_error:
-            print(f"[Upload] Failed to publish SSE event: {sse_error}")
+            logger.warning("[Upload] Failed to publish SSE event: %s", sse_error)
 
         raise HTTPException(status_code=500, detail=str(e))
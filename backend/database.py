@@ -1,6 +1,8 @@
 import os
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
+from supabase import AsyncClient, AsyncClientOptions
 from notion_client import Client as NotionClient
 
 load_dotenv()
@@ -8,7 +10,48 @@ load_dotenv()
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# PostgREST connection pool: idle connections are kept for a minute so
+# requests a few seconds apart reuse the TLS connection (httpx default is 5s)
+SUPABASE_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=30, keepalive_expiry=60)
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose HTTP/2 session uses SUPABASE_POOL_LIMITS."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=SUPABASE_POOL_LIMITS,
+        )
+
+
+class _PooledAsyncClient(AsyncClient):
+    """Supabase AsyncClient using _PooledPostgrestClient (supabase-py has no pool option)."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=30, verify=True, proxy=None):
+        return _PooledPostgrestClient(
+            rest_url, headers=headers, schema=schema, timeout=timeout, verify=verify, proxy=proxy
+        )
+
+
+# Async client (postgrest/storage over httpx, HTTP/2) - awaiting .execute() frees the event loop
+supabase_async: AsyncClient = _PooledAsyncClient(
+    SUPABASE_URL, SUPABASE_KEY, AsyncClientOptions(postgrest_client_timeout=30)
+)
+
+# Shared outbound HTTP client (Google Calendar / Notion REST) - keep-alive reuse across requests
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(30.0),
+    limits=httpx.Limits(max_keepalive_connections=50),
+)
 
 # Notion - Internal Integration (기본)
 NOTION_SECRET = os.getenv("NOTION_SECRET")
@@ -2,24 +2,67 @@
 AI analysis utilities.
 """
 
+import asyncio
+import logging
 import re
 
-from database import supabase
+from database import supabase_async
 from models.schemas import AIAnalysisData
 
 
+logger = logging.getLogger(__name__)
+
+
 def _load_ai_module():
     """Load AI module (router + service functions)"""
     try:
         from ai.app import router as ai_router, analyze_text, analyze_image_bytes, is_ai_available
         return ai_router, analyze_text, analyze_image_bytes, is_ai_available
     except Exception as e:
-        print(f"[AI] 모듈 로드 실패: {e}")
+        logger.warning("[AI] 모듈 로드 실패: %s", e)
         return None, None, None, lambda: False
 
 
-# Load AI module on import
-ai_router, ai_analyze_text, ai_analyze_image_bytes, ai_is_available = _load_ai_module()
+# AI module is loaded in the background after startup (see load_ai_module);
+# until then analysis waits for the load and /health reports unavailable.
+ai_router, ai_analyze_text, ai_analyze_image_bytes, ai_is_available = None, None, None, lambda: False
+_AI_READY = False
+_ai_loading = None
+
+
+def _load_and_apply_ai_module() -> bool:
+    global ai_router, ai_analyze_text, ai_analyze_image_bytes, ai_is_available, _AI_READY
+    ai_router, ai_analyze_text, ai_analyze_image_bytes, ai_is_available = _load_ai_module()
+    # AI availability is fixed once loaded (client is created once); checked once here
+    _AI_READY = ai_is_available() and ai_analyze_text is not None
+    return ai_router is not None
+
+
+async def load_ai_module() -> bool:
+    """
+    Import the AI module (Gemini SDK, Pillow) in a worker thread, once.
+
+    Concurrent callers share the same load. Returns whether the AI router loaded.
+    """
+    global _ai_loading
+    if _ai_loading is None:
+        _ai_loading = asyncio.ensure_future(asyncio.to_thread(_load_and_apply_ai_module))
+    return await asyncio.shield(_ai_loading)
+
+
+# Calendar keywords for fallback classification (compiled once into a single alternation)
+CALENDAR_KEYWORDS = [
+    "내일", "모레", "다음주", "이번주", "오늘",
+    "시에", "시 ", "분에", "약속", "미팅", "회의",
+    "점심", "저녁", "아침", "오전", "오후",
+    "월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일",
+    "일정", "예약", "방문", "출장", "면접",
+]
+_CALENDAR_RE = re.compile("|".join(map(re.escape, CALENDAR_KEYWORDS)))
+
+# AI response cleanup: fenced ```json block, else the outermost JSON object
+_FENCED_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```")
+_JSON_OBJ_RE = re.compile(r"\{[\s\S]*\}")
 
 
 def _fallback_analyze(text: str) -> dict:
@@ -27,16 +70,7 @@ def _fallback_analyze(text: str) -> dict:
     safe_text = text or ""
     text_lower = safe_text.lower()
 
-    # Calendar keywords
-    calendar_keywords = [
-        "내일", "모레", "다음주", "이번주", "오늘",
-        "시에", "시 ", "분에", "약속", "미팅", "회의",
-        "점심", "저녁", "아침", "오전", "오후",
-        "월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일",
-        "일정", "예약", "방문", "출장", "면접",
-    ]
-
-    is_calendar = any(kw in text_lower for kw in calendar_keywords)
+    is_calendar = _CALENDAR_RE.search(text_lower) is not None
     input_type = "CALENDAR" if is_calendar else "MEMO"
 
     summary = safe_text[:50] if len(safe_text) > 50 else safe_text
@@ -60,12 +94,12 @@ def _clean_ai_response(raw_text: str) -> str:
         return raw_text
 
     # Extract content from ```json or ``` blocks
-    match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", raw_text)
+    match = _FENCED_RE.search(raw_text)
     if match:
         return match.group(1).strip()
 
     # Try to extract JSON object only
-    match = re.search(r"\{[\s\S]*\}", raw_text)
+    match = _JSON_OBJ_RE.search(raw_text)
     if match:
         return match.group(0).strip()
 
@@ -91,7 +125,7 @@ async def _run_ai_analysis(
         calendar_categories: JSON string array of user's CALENDAR categories
 
     Logic:
-    1. Perform AI analysis
+    1. Perform AI analysis (keyword fallback when the AI module is unavailable)
     2. Parse response and validate with AIAnalysisData
     3. On success: Update status='ANALYZED'
     4. On failure: Save error without calling AIAnalysisData
@@ -100,27 +134,30 @@ async def _run_ai_analysis(
     error_message = None
 
     try:
-        # Step 1: Check if AI module is available
-        if not ai_is_available():
-            raise RuntimeError("AI 모듈이 사용 불가능합니다.")
-
-        print(f"[AI] 레코드 {record_id} Gemini 분석 시작 (이미지: {'있음' if image_bytes else '없음'})")
-
-        # Step 2: Perform AI analysis
-        if image_bytes and ai_analyze_image_bytes is not None:
-            analysis_result = await ai_analyze_image_bytes(
-                image_bytes, image_mime_type, text,
-                memo_categories=memo_categories,
-                calendar_categories=calendar_categories,
-            )
-        elif text and ai_analyze_text is not None:
-            analysis_result = await ai_analyze_text(
-                text,
-                memo_categories=memo_categories,
-                calendar_categories=calendar_categories,
-            )
+        await load_ai_module()
+
+        # Step 1: Without the AI module, classify by keywords (no Gemini call)
+        if not _AI_READY:
+            logger.info("[AI] 레코드 %s AI 모듈 사용 불가 - 키워드 분류로 대체", record_id)
+            analysis_result = _fallback_analyze(text)
         else:
-            raise ValueError("분석할 텍스트 또는 이미지가 없습니다.")
+            logger.info("[AI] 레코드 %s Gemini 분석 시작 (이미지: %s)", record_id, "있음" if image_bytes else "없음")
+
+            # Step 2: Perform AI analysis
+            if image_bytes and ai_analyze_image_bytes is not None:
+                analysis_result = await ai_analyze_image_bytes(
+                    image_bytes, image_mime_type, text,
+                    memo_categories=memo_categories,
+                    calendar_categories=calendar_categories,
+                )
+            elif text and ai_analyze_text is not None:
+                analysis_result = await ai_analyze_text(
+                    text,
+                    memo_categories=memo_categories,
+                    calendar_categories=calendar_categories,
+                )
+            else:
+                raise ValueError("분석할 텍스트 또는 이미지가 없습니다.")
 
         # Step 3: Check if AI response is an error dict
         # (ai/app.py's _parse_json_response returns {"error": ..., "raw": ...} on parse failure)
@@ -129,11 +166,11 @@ async def _run_ai_analysis(
             raise ValueError(f"AI 응답 파싱 실패: {analysis_result.get('error')}")
 
         # Step 4: Validate with AIAnalysisData model (may raise pydantic ValidationError)
-        validated = AIAnalysisData(**analysis_result)
+        validated = AIAnalysisData.model_validate(analysis_result)
         analysis_payload = validated.model_dump(exclude_none=True)
 
         # Step 5: Update DB on success
-        supabase.table("inputs").update({
+        await supabase_async.table("inputs").update({
             "status": "ANALYZED",
             "type": validated.type,
             "result": analysis_payload,
@@ -145,12 +182,12 @@ async def _run_ai_analysis(
             "analysis_completed",
             {"record_id": record_id, "status": "ANALYZED", "analysis_data": analysis_payload},
         )
-        print(f"[AI] 레코드 {record_id} 분석 완료: {validated.type}")
+        logger.info("[AI] 레코드 %s 분석 완료: %s", record_id, validated.type)
 
     except Exception as e:
         # Step 6: On failure, save error without calling AIAnalysisData
         error_message = str(e)
-        print(f"[AI] 레코드 {record_id} 분석 실패: {error_message}")
+        logger.warning("[AI] 레코드 %s 분석 실패: %s", record_id, error_message)
 
         # Save failure result (status stays PENDING due to DB CHECK constraint)
         fail_result = {
@@ -161,7 +198,7 @@ async def _run_ai_analysis(
         if raw_response:
             fail_result["raw_text"] = raw_response[:2000]  # Truncate if too long
 
-        supabase.table("inputs").update({
+        await supabase_async.table("inputs").update({
             "result": fail_result,
         }).eq("id", record_id).execute()
 
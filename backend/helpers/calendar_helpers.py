@@ -2,8 +2,21 @@
 Google Calendar utilities.
 """
 
-from typing import Optional, List
+import hashlib
+import time
+from typing import Dict, Optional, List, Tuple
+from urllib.parse import quote
 
+from database import http_client
+
+
+# Google Calendar REST API
+GOOGLE_CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
+
+# Cache for calendar name -> id per user (5-minute TTL)
+_calendar_list_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+CALENDAR_LIST_CACHE_TTL = 300  # 5 minutes
+CALENDAR_LIST_CACHE_SIZE = 1024
 
 # Color mapping for Google Calendar categories
 CATEGORY_COLOR_MAP = {
@@ -13,6 +26,7 @@ CATEGORY_COLOR_MAP = {
     "important": "4",
     "default": "1",
 }
+DEFAULT_CATEGORY_COLOR = CATEGORY_COLOR_MAP["default"]
 
 
 def _convert_recurrence_to_rrule(recurrence: Optional[str]) -> Optional[List[str]]:
@@ -27,3 +41,80 @@ def _convert_recurrence_to_rrule(recurrence: Optional[str]) -> Optional[List[str
     }
     rrule = mapping.get(recurrence.lower())
     return [rrule] if rrule else None
+
+
+def _google_headers(google_token: str) -> dict:
+    return {"Authorization": f"Bearer {google_token}"}
+
+
+async def list_google_calendars(google_token: str) -> List[dict]:
+    """Fetch the user's calendar list (calendarList.list)."""
+    response = await http_client.get(
+        f"{GOOGLE_CALENDAR_API_URL}/users/me/calendarList",
+        headers=_google_headers(google_token),
+    )
+    response.raise_for_status()
+    return response.json().get("items", [])
+
+
+async def insert_google_calendar_event(google_token: str, calendar_id: str, event_body: dict) -> dict:
+    """Create an event in the given calendar (events.insert)."""
+    response = await http_client.post(
+        f"{GOOGLE_CALENDAR_API_URL}/calendars/{quote(calendar_id, safe='')}/events",
+        headers=_google_headers(google_token),
+        json=event_body,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _token_cache_key(google_token: str) -> str:
+    """Cache key for a token-only caller - a digest, so raw tokens aren't kept as keys."""
+    return hashlib.blake2b(google_token.encode(), digest_size=16).hexdigest()
+
+
+async def resolve_calendar_id(cache_key: Optional[str], google_token: str, calendar_name: Optional[str]) -> str:
+    """
+    Resolve a calendar name to its ID, falling back to "primary".
+
+    The user's name -> id mapping is cached for CALENDAR_LIST_CACHE_TTL so
+    repeat uploads skip the calendarList round trip. cache_key is the user id;
+    pass None to key by a digest of the token.
+    """
+    if not calendar_name:
+        return "primary"
+
+    if cache_key is None:
+        cache_key = _token_cache_key(google_token)
+
+    entry = _calendar_list_cache.get(cache_key)
+    if entry and time.time() - entry[0] < CALENDAR_LIST_CACHE_TTL:
+        name_to_id = entry[1]
+    else:
+        calendars = await list_google_calendars(google_token)
+        name_to_id = _store_calendar_list(cache_key, calendars)
+
+    return name_to_id.get(calendar_name, "primary")
+
+
+def _store_calendar_list(cache_key: str, calendars: List[dict]) -> Dict[str, str]:
+    name_to_id: Dict[str, str] = {}
+    for cal in calendars:
+        # Keep the first calendar for duplicate names (same as the original linear scan)
+        name_to_id.setdefault(cal.get("summary"), cal.get("id"))
+    if len(_calendar_list_cache) >= CALENDAR_LIST_CACHE_SIZE:
+        _calendar_list_cache.clear()  # entries are short-lived; refetching is cheap
+    _calendar_list_cache[cache_key] = (time.time(), name_to_id)
+    return name_to_id
+
+
+def refresh_calendar_list_cache(user_id: Optional[str], google_token: str, calendars: List[dict]):
+    """
+    Replace the cached name -> id mapping with a freshly fetched calendar list.
+
+    Called by the calendar sync so events created right after it see newly added
+    or renamed calendars. Both the user id and token digest keys are refreshed.
+    """
+    name_to_id = _store_calendar_list(_token_cache_key(google_token), calendars)
+    if user_id:
+        _calendar_list_cache[user_id] = (time.time(), name_to_id)
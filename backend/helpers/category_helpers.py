@@ -0,0 +1,36 @@
+"""
+Category list caching utilities.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Cache for GET /categories per (user_id, type filter) (60-second TTL).
+# Category writes all go through this backend and invalidate the user's entries.
+CATEGORY_CACHE_TTL = 60
+CATEGORY_CACHE_SIZE = 1024
+_category_cache: Dict[Tuple[str, Optional[str]], Tuple[float, List[dict]]] = {}
+
+
+def get_cached_categories(user_id: str, category_type: Optional[str]) -> Optional[List[dict]]:
+    """Return the cached category list, or None if missing or expired."""
+    entry = _category_cache.get((user_id, category_type))
+    if entry and time.monotonic() - entry[0] < CATEGORY_CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def set_cached_categories(user_id: str, category_type: Optional[str], categories: List[dict]):
+    if len(_category_cache) >= CATEGORY_CACHE_SIZE:
+        _category_cache.clear()  # entries are short-lived; refetching is cheap
+    _category_cache[(user_id, category_type)] = (time.monotonic(), categories)
+
+
+def invalidate_categories(user_id: Optional[str] = None):
+    """Drop cached category lists for a user (all type filters), or for everyone."""
+    if user_id is None:
+        _category_cache.clear()
+        return
+    for key in [key for key in _category_cache if key[0] == user_id]:
+        _category_cache.pop(key, None)
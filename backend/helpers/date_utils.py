@@ -2,14 +2,23 @@
 Date/time parsing utilities.
 """
 
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from typing import Tuple
+
+# (epoch second, ISO string) of the last _iso_now() call
+_iso_now_cache: Tuple[int, str] = (0, "")
 
 
 def _parse_iso_datetime(value: str) -> datetime:
     """Parse ISO datetime string, handling Z timezone suffix."""
-    if value.endswith("Z"):
-        value = value[:-1] + "+00:00"
-    return datetime.fromisoformat(value)
+    try:
+        # C fast path; accepts "Z" itself on Python 3.11+
+        return datetime.fromisoformat(value)
+    except ValueError:
+        if not value.endswith("Z"):
+            raise
+    return datetime.fromisoformat(value[:-1] + "+00:00")
 
 
 def _parse_iso_date(value: str) -> datetime:
@@ -18,3 +27,12 @@ def _parse_iso_date(value: str) -> datetime:
         return datetime.fromisoformat(value)
     except ValueError:
         return datetime.fromisoformat(value + "T00:00:00")
+
+
+def _iso_now() -> str:
+    """Current UTC time as an ISO string, cached per second (for DB timestamps)."""
+    global _iso_now_cache
+    now = int(time.time())
+    if _iso_now_cache[0] != now:
+        _iso_now_cache = (now, datetime.fromtimestamp(now, tz=timezone.utc).isoformat())
+    return _iso_now_cache[1]
@@ -0,0 +1,125 @@
+"""
+Supabase write utilities.
+"""
+
+import asyncio
+import logging
+import operator
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from database import supabase_async
+
+
+logger = logging.getLogger(__name__)
+
+# Flush a batch once it has this many rows, or once the window has elapsed
+INSERT_BATCH_SIZE = 32
+INSERT_BATCH_WINDOW = 0.03  # seconds
+
+
+class InsertBatcher:
+    """
+    Micro-batch inserts into one Supabase table.
+
+    Rows submitted within INSERT_BATCH_WINDOW of each other are sent as a single
+    insert([...]) request, so a burst of N records costs one PostgREST round trip.
+    Each caller gets back its own inserted row. If the batch insert request fails,
+    rows are retried one by one so a single bad row doesn't fail the whole batch.
+    Once the batch is committed rows are never re-inserted; a caller whose row
+    can't be found in the result gets an error instead.
+    Batches are flushed as separate tasks, so a slow insert doesn't hold up the next.
+    """
+
+    def __init__(self, table: str) -> None:
+        self._table = table
+        self._queue: Optional[asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references to in-flight flushes (the loop only keeps weak ones)
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a row for insertion and return the inserted record."""
+        if self._worker is None or self._worker.done():
+            # Created on first use so the queue and task bind to the running loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + INSERT_BATCH_WINDOW
+            while len(batch) < INSERT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            result = await supabase_async.table(self._table).insert([row for row, _ in batch]).execute()
+        except Exception as e:
+            logger.warning("[DB] %s 일괄 저장 실패, 개별 저장으로 재시도: %s", self._table, e)
+            await asyncio.gather(*(self._insert_one(row, future) for row, future in batch))
+            return
+
+        # The batch is committed from here on - retrying a row would insert it twice
+        unclaimed = list(result.data or [])
+        if len(unclaimed) != len(batch):
+            logger.error("[DB] %s 일괄 저장: %d개 중 %d개만 반환됨", self._table, len(batch), len(unclaimed))
+
+        # RETURNING order isn't guaranteed - hand each caller the row matching what it sent
+        for row, future in batch:
+            record = _claim_matching(row, unclaimed)
+            if future.done():
+                continue
+            if record is None:
+                # Never hand a caller another caller's row
+                logger.error("[DB] %s 일괄 저장 결과 매칭 실패: %s", self._table, row)
+                future.set_exception(RuntimeError("저장된 레코드를 찾을 수 없습니다"))
+            else:
+                future.set_result(record)
+
+    async def _insert_one(self, row: Dict[str, Any], future: asyncio.Future) -> None:
+        try:
+            result = await supabase_async.table(self._table).insert(row).execute()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result.data[0] if result.data else None)
+
+
+def _loose_eq(returned: Any, sent: Any) -> bool:
+    # Some column types come back normalized (e.g. uuid in lower case)
+    if isinstance(returned, str) and isinstance(sent, str):
+        return returned.casefold() == sent.casefold()
+    return returned == sent
+
+
+def _claim_matching(row: Dict[str, Any], records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Remove and return the record whose submitted columns match row's.
+
+    Exact matches are tried first, then case-insensitive string comparison.
+    """
+    for equal in (operator.eq, _loose_eq):
+        for i, record in enumerate(records):
+            if all(equal(record.get(key), value) for key, value in row.items()):
+                return records.pop(i)
+    return None
+
+
+# Record rows created by /records/analyze
+inputs_batcher = InsertBatcher("inputs")
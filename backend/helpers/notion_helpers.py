@@ -2,12 +2,225 @@
 Notion property detection and page building utilities.
 """
 
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
 import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
+import orjson
+from notion_client import Client
+from notion_client.errors import APIResponseError, HTTPResponseError, is_api_error_code
 
-# Cache for Notion property detection (1-hour TTL)
-_notion_property_cache = {}
-CACHE_TTL = 3600  # 1 hour
+from database import http_client, supabase_async
+
+
+logger = logging.getLogger(__name__)
+
+
+class NotionClient(Client):
+    """
+    notion-client Client that decodes successful responses with orjson.
+
+    Every request waits for the shared Notion rate limiter first.
+    """
+
+    def request(self, *args, **kwargs):
+        _notion_rate_limiter.wait()
+        return super().request(*args, **kwargs)
+
+    def _parse_response(self, response):
+        if response.is_success:
+            return orjson.loads(response.content)
+        # Error responses keep the SDK's APIResponseError mapping
+        return super()._parse_response(response)
+
+
+@lru_cache(maxsize=512)
+def get_notion_client(token: str) -> NotionClient:
+    """
+    Get a NotionClient for the token, reusing its connection pool across requests.
+
+    Keeps TCP/TLS connections to api.notion.com alive between calls for the
+    same user instead of opening a new httpx.Client per request.
+    """
+    return NotionClient(auth=token)
+
+
+# Notion REST API (same version notion-client sends)
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+NOTION_MAX_CHILDREN = 100  # blocks per create/append request
+
+
+# Select property names recognised as the category column
+_CATEGORY_PROPERTY_NAMES = frozenset({"카테고리", "Category"})
+
+# Cache for Notion property detection (24-hour TTL).
+# Level 1 is an lru_cache keyed by (database_id, TTL bucket, nonce): a new
+# bucket expires entries, bumping the per-database nonce invalidates them.
+# Schemas rarely change, so entries are invalidated on our own schema writes
+# (add_notion_properties) and when Notion rejects a page against a stale schema
+# rather than refetched on a short timer.
+CACHE_TTL = 86400  # 24 hours
+SCHEMA_CACHE_SIZE = 512  # databases kept in level 1 (and in the bookkeeping dicts below)
+_schema_nonce: Dict[str, int] = {}
+# Client for the current thread's fetch (clients aren't part of the cache key)
+_schema_fetch = threading.local()
+# Known schemas (e.g. after adding a property) picked up by the next cache miss
+_schema_seed: Dict[str, dict] = {}
+
+# Optional second-level schema cache shared by all workers on the host.
+# SQLite in WAL mode, one row per database_id; disabled when unset.
+NOTION_SCHEMA_CACHE_PATH = os.getenv("NOTION_SCHEMA_CACHE_PATH")
+_schema_db = None
+_schema_db_lock = threading.Lock()
+
+# Upper bound on concurrent outbound Notion API calls per worker
+NOTION_MAX_CONCURRENCY = 10
+_notion_semaphore = asyncio.Semaphore(NOTION_MAX_CONCURRENCY)
+
+# Notion allows an average of 3 requests/second per integration
+NOTION_REQUESTS_PER_SECOND = 3
+
+
+class NotionRateLimiter:
+    """
+    Token bucket shared by SDK calls (worker threads) and async REST calls.
+
+    Each request reserves the next slot under a lock and then sleeps until
+    it, so up to `burst` requests go out immediately and the rest are spaced
+    1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self._interval = 1.0 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._next_slot = 0.0  # theoretical arrival time of the next request
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve a slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self._interval
+            return max(0.0, slot - now - self._tolerance)
+
+    def wait(self):
+        """Blocking acquire, for SDK calls running in worker threads."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire(self):
+        """Async acquire, for calls made on the event loop."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+_notion_rate_limiter = NotionRateLimiter(NOTION_REQUESTS_PER_SECOND, burst=NOTION_REQUESTS_PER_SECOND)
+
+
+async def notion_call(fn, *args, **kwargs):
+    """
+    Run a blocking notion-client call in a worker thread.
+
+    Calls are bounded by a shared semaphore so fan-out (e.g. asyncio.gather
+    over many retrieves) can't exhaust the connection pool, and each HTTP
+    request made by NotionClient is paced by the shared rate limiter.
+    """
+    async with _notion_semaphore:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+def _parse_notion_response(response):
+    """Decode a Notion API response, raising the SDK's error types on failure."""
+    if response.is_success:
+        return orjson.loads(response.content)
+    try:
+        body = orjson.loads(response.content)
+        code = body.get("code")
+    except orjson.JSONDecodeError:
+        code = None
+    if code and is_api_error_code(code):
+        raise APIResponseError(response, body["message"], code)
+    raise HTTPResponseError(response)
+
+
+async def create_notion_page(token: str, page_body: dict) -> dict:
+    """
+    Create a Notion page over the shared async HTTP client.
+
+    Equivalent to NotionClient(auth=token).pages.create(**page_body), without
+    blocking the event loop or opening a new connection per upload.
+    Children are sent with the create request; anything past Notion's
+    100-block limit is appended in 100-block batches.
+    """
+    headers = {"Authorization": f"Bearer {token}", "Notion-Version": NOTION_VERSION}
+    children = page_body.get("children") or []
+    if len(children) > NOTION_MAX_CHILDREN:
+        page_body = {**page_body, "children": children[:NOTION_MAX_CHILDREN]}
+
+    async with _notion_semaphore:
+        await _notion_rate_limiter.acquire()
+        response = await http_client.post(f"{NOTION_API_URL}/pages", headers=headers, json=page_body)
+    try:
+        page = _parse_notion_response(response)
+    except APIResponseError as e:
+        # Properties didn't match the database - the cached schema is stale
+        database_id = page_body.get("parent", {}).get("database_id")
+        if e.code == "validation_error" and database_id:
+            # Off the event loop - the shared level is a SQLite delete + commit
+            await asyncio.to_thread(clear_notion_cache, database_id)
+        raise
+
+    for start in range(NOTION_MAX_CHILDREN, len(children), NOTION_MAX_CHILDREN):
+        async with _notion_semaphore:
+            await _notion_rate_limiter.acquire()
+            response = await http_client.patch(
+                f"{NOTION_API_URL}/blocks/{page['id']}/children",
+                headers=headers,
+                json={"children": children[start:start + NOTION_MAX_CHILDREN]},
+            )
+        _parse_notion_response(response)
+
+    return page
+
+
+# In-flight users lookups keyed by user_id (single-flight)
+_user_notion_inflight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+
+
+async def _fetch_user_notion(user_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch user's Notion access token and database ID from Supabase."""
+    result = await supabase_async.table("users")\
+        .select("notion_access_token, notion_database_id")\
+        .eq("id", user_id)\
+        .single()\
+        .execute()
+    return result.data
+
+
+async def get_user_notion(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get user's Notion credentials (access token + database ID).
+
+    - Single query shape shared by every endpoint that needs Notion access
+    - Only one Supabase query is in flight per user_id
+    - Concurrent callers await the same result (or exception)
+    """
+    inflight = _user_notion_inflight.get(user_id)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_fetch_user_notion(user_id))
+        _user_notion_inflight[user_id] = inflight
+        inflight.add_done_callback(lambda _: _user_notion_inflight.pop(user_id, None))
+    # Shield so a cancelled caller doesn't cancel the lookup for the others
+    return await asyncio.shield(inflight)
 
 
 def detect_notion_properties(notion_client, database_id: str):
@@ -25,11 +238,12 @@ def detect_notion_properties(notion_client, database_id: str):
     db_info = notion_client.databases.retrieve(database_id=database_id)
     existing_properties = db_info.get("properties", {})
 
-    # Debug logging
-    print(f"[Notion] Database ID: {database_id}")
-    print(f"[Notion] Found {len(existing_properties)} properties:")
-    for prop_name, prop_config in existing_properties.items():
-        print(f"  - {prop_name}: {prop_config.get('type')}")
+    # Debug logging (skipped entirely unless DEBUG is enabled)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Notion] Database ID: %s", database_id)
+        logger.debug("[Notion] Found %d properties:", len(existing_properties))
+        for prop_name, prop_config in existing_properties.items():
+            logger.debug("  - %s: %s", prop_name, prop_config.get("type"))
 
     # Check if properties are empty (permission issue)
     if not existing_properties:
@@ -39,11 +253,18 @@ def detect_notion_properties(notion_client, database_id: str):
             "(데이터베이스 우측 상단 ··· → 연결 → One Gate 선택)"
         )
 
-    # 2. Find title property (must exist, use whatever name it has)
+    # 2. Find title property (must exist, use whatever name it has) and
+    #    category property ('카테고리' or 'Category') in a single pass
     title_property = None
+    category_property = None
     for prop_name, prop_config in existing_properties.items():
-        if prop_config.get("type") == "title":
-            title_property = prop_name
+        prop_type = prop_config.get("type")
+        if prop_type == "title":
+            if title_property is None:
+                title_property = prop_name
+        elif prop_type == "select" and category_property is None and prop_name in _CATEGORY_PROPERTY_NAMES:
+            category_property = prop_name
+        if title_property is not None and category_property is not None:
             break
 
     if not title_property:
@@ -51,14 +272,7 @@ def detect_notion_properties(notion_client, database_id: str):
         prop_types = {name: cfg.get("type") for name, cfg in existing_properties.items()}
         raise ValueError(f"데이터베이스에 title 속성이 없습니다. 발견된 속성: {prop_types}")
 
-    # 3. Find category property (try '카테고리' or 'Category')
-    category_property = None
-    for prop_name, prop_config in existing_properties.items():
-        if prop_config.get("type") == "select" and prop_name in ["카테고리", "Category"]:
-            category_property = prop_name
-            break
-
-    # 4. If no category found, we'll create 'Category'
+    # 3. If no category found, we'll create 'Category'
     needs_category = category_property is None
     if needs_category:
         category_property = "Category"
@@ -70,55 +284,179 @@ def detect_notion_properties(notion_client, database_id: str):
     }
 
 
-def add_notion_property(notion_client, database_id: str, property_name: str, property_config: dict):
+# ============================================================
+# Shared schema cache (SQLite)
+# ============================================================
+
+def _get_schema_db() -> sqlite3.Connection:
+    """Open the shared schema cache database on first use."""
+    global _schema_db
+    if _schema_db is None:
+        conn = sqlite3.connect(NOTION_SCHEMA_CACHE_PATH, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS notion_schema ("
+            "database_id TEXT PRIMARY KEY, props_info TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        conn.commit()
+        _schema_db = conn
+    return _schema_db
+
+
+def cache_get(database_id: str):
     """
-    Add a single property to Notion database.
+    Read a schema from the shared cache.
+
+    Returns:
+        (props_info, fetched_at) if present and not expired, else None
     """
-    notion_client.databases.update(
-        database_id=database_id,
-        properties={
-            property_name: property_config
-        }
-    )
+    if not NOTION_SCHEMA_CACHE_PATH:
+        return None
+    try:
+        with _schema_db_lock:
+            row = _get_schema_db().execute(
+                "SELECT props_info, fetched_at FROM notion_schema WHERE database_id = ?",
+                (database_id,),
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("[Notion] Shared schema cache read failed: %s", e)
+        return None
+
+    if row is None or time.time() - row[1] >= CACHE_TTL:
+        return None
+    return orjson.loads(row[0]), row[1]
+
+
+def cache_set(database_id: str, props_info: dict, fetched_at: float):
+    """Write a schema to the shared cache."""
+    if not NOTION_SCHEMA_CACHE_PATH:
+        return
+    try:
+        with _schema_db_lock:
+            conn = _get_schema_db()
+            conn.execute(
+                "INSERT OR REPLACE INTO notion_schema (database_id, props_info, fetched_at) VALUES (?, ?, ?)",
+                (database_id, orjson.dumps(props_info).decode(), fetched_at),
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning("[Notion] Shared schema cache write failed: %s", e)
+
+
+def cache_delete(database_id: str = None):
+    """Delete one schema (or all) from the shared cache."""
+    if not NOTION_SCHEMA_CACHE_PATH:
+        return
+    try:
+        with _schema_db_lock:
+            conn = _get_schema_db()
+            if database_id:
+                conn.execute("DELETE FROM notion_schema WHERE database_id = ?", (database_id,))
+            else:
+                conn.execute("DELETE FROM notion_schema")
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning("[Notion] Shared schema cache delete failed: %s", e)
+
+
+def add_notion_properties(notion_client, database_id: str, properties: dict):
+    """
+    Add properties to Notion database in a single update.
+
+    Args:
+        properties: {property_name: property_config, ...}
+    """
+    notion_client.databases.update(database_id=database_id, properties=properties)
+    # Schema changed - drop the cached copy in both levels
+    clear_notion_cache(database_id)
+
+
+def _invalidate_schema(database_id: str):
+    _schema_nonce[database_id] = _schema_nonce.get(database_id, 0) + 1
+    if len(_schema_nonce) > SCHEMA_CACHE_SIZE:
+        # Forgetting one nonce would revive entries cached under it - start level 1 over instead
+        _schema_nonce.clear()
+        _cached_notion_properties.cache_clear()
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _cached_notion_properties(database_id: str, bucket: int, nonce: int):
+    """Level-1 cache miss: seeded schema, then the shared cache, then Notion."""
+    seeded = _schema_seed.pop(database_id, None)
+    if seeded is not None:
+        return seeded
+
+    # Check shared cache (populated by other workers / before restart)
+    shared = cache_get(database_id)
+    if shared is not None:
+        logger.debug("[Notion] Using shared cached properties for: %s", database_id)
+        return shared[0]
+
+    logger.info("[Notion] Fetching fresh properties for: %s", database_id)
+    props_info = detect_notion_properties(_schema_fetch.client, database_id)
+    cache_set(database_id, props_info, time.time())
+    return props_info
 
 
 def clear_notion_cache(database_id: str = None):
     """Clear Notion property cache for a specific database or all."""
     if database_id:
-        _notion_property_cache.pop(database_id, None)
-        print(f"[Notion] Cache cleared for database: {database_id}")
+        _invalidate_schema(database_id)
+        logger.info("[Notion] Cache cleared for database: %s", database_id)
     else:
-        _notion_property_cache.clear()
-        print("[Notion] All cache cleared")
+        _cached_notion_properties.cache_clear()
+        logger.info("[Notion] All cache cleared")
+    cache_delete(database_id)
+
+
+def set_notion_properties_cached(database_id: str, props_info: dict):
+    """Store known properties (e.g. after adding one) in both cache levels."""
+    if len(_schema_seed) >= SCHEMA_CACHE_SIZE:
+        _schema_seed.clear()  # seeds only save a fetch; dropping them is safe
+    _schema_seed[database_id] = props_info
+    _invalidate_schema(database_id)
+    cache_set(database_id, props_info, time.time())
 
 
 def get_notion_properties_cached(notion_client, database_id: str, force_refresh: bool = False):
     """
     Get properties with caching to avoid repeated API calls.
     """
-    now = time.time()
-
-    # Force refresh if requested
-    if force_refresh and database_id in _notion_property_cache:
-        del _notion_property_cache[database_id]
-        print(f"[Notion] Force refreshing cache for: {database_id}")
-
-    # Check cache
-    if database_id in _notion_property_cache:
-        cached = _notion_property_cache[database_id]
-        if now - cached["timestamp"] < CACHE_TTL:
-            print(f"[Notion] Using cached properties for: {database_id}")
-            return cached["props_info"]
-
-    # Not cached or expired, detect fresh
-    print(f"[Notion] Fetching fresh properties for: {database_id}")
-    props_info = detect_notion_properties(notion_client, database_id)
-    _notion_property_cache[database_id] = {
-        "props_info": props_info,
-        "timestamp": now
+    # Force refresh if requested (drop both levels so the next lookup hits Notion)
+    if force_refresh:
+        _invalidate_schema(database_id)
+        cache_delete(database_id)
+        logger.info("[Notion] Force refreshing cache for: %s", database_id)
+
+    _schema_fetch.client = notion_client
+    bucket = int(time.monotonic() // CACHE_TTL)
+    return _cached_notion_properties(database_id, bucket, _schema_nonce.get(database_id, 0))
+
+
+def _heading_3(content: str) -> dict:
+    return {
+        "object": "block",
+        "type": "heading_3",
+        "heading_3": {
+            "rich_text": [{"type": "text", "text": {"content": content}}]
+        }
+    }
+
+
+def _paragraph(content: str) -> dict:
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {
+            "rich_text": [{"type": "text", "text": {"content": content}}]
+        }
     }
 
-    return props_info
+
+# Fixed section headings, built once. Shared across pages: blocks are only
+# serialized into the request body and never mutated.
+_ANALYSIS_HEADING = _heading_3("분석 내용")
+_ORIGINAL_TEXT_HEADING = _heading_3("원본 메모")
 
 
 def build_notion_page_blocks(record, upload_data):
@@ -130,66 +468,41 @@ def build_notion_page_blocks(record, upload_data):
         upload_data: AI analysis data with content, body fields
 
     Returns:
-        List of Notion block objects
+        List of Notion block objects (heading blocks are shared - don't mutate).
+        Pass the whole list as the page's children (create_notion_page) rather
+        than appending blocks one request at a time.
     """
+    # Each field is looked up once and reused below (including the fallback)
+    image_url = record.get("image_url")
+    original_text = record.get("text") or ""
+    analysis_content = upload_data.get("content")
+
     blocks = []
 
     # 1. Add image block if image exists
-    if record.get("image_url"):
+    if image_url:
         blocks.append({
             "object": "block",
             "type": "image",
             "image": {
                 "type": "external",
-                "external": {"url": record["image_url"]}
+                "external": {"url": image_url}
             }
         })
 
     # 2. Add analysis heading + content
-    analysis_content = upload_data.get("content")
     if analysis_content:
-        blocks.append({
-            "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [{"type": "text", "text": {"content": "분석 내용"}}]
-            }
-        })
-        blocks.append({
-            "object": "block",
-            "type": "paragraph",
-            "paragraph": {
-                "rich_text": [{"type": "text", "text": {"content": analysis_content}}]
-            }
-        })
+        blocks.append(_ANALYSIS_HEADING)
+        blocks.append(_paragraph(analysis_content))
 
     # 3. Add original text if different from analysis content
-    original_text = record.get("text", "")
     if original_text and original_text != analysis_content:
-        blocks.append({
-            "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [{"type": "text", "text": {"content": "원본 메모"}}]
-            }
-        })
-        blocks.append({
-            "object": "block",
-            "type": "paragraph",
-            "paragraph": {
-                "rich_text": [{"type": "text", "text": {"content": original_text}}]
-            }
-        })
+        blocks.append(_ORIGINAL_TEXT_HEADING)
+        blocks.append(_paragraph(original_text))
 
     # Fallback: if no blocks were added, add a simple paragraph
     if not blocks:
-        fallback_content = upload_data.get("content") or original_text or "내용 없음"
-        blocks.append({
-            "object": "block",
-            "type": "paragraph",
-            "paragraph": {
-                "rich_text": [{"type": "text", "text": {"content": fallback_content}}]
-            }
-        })
+        # analysis_content and original_text are both empty here
+        blocks.append(_paragraph("내용 없음"))
 
     return blocks
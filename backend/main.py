@@ -9,76 +9,118 @@ Refactored main entry point with modular structure:
 """
 
 import asyncio
-import json
-from typing import Any, Dict
+import logging
+import logging.handlers
+import queue
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 
 # ============================================================
-# Database and Services
+# Logging
 # ============================================================
 
-from database import supabase
+def _configure_logging() -> logging.handlers.QueueListener:
+    """
+    Route all log records through an in-memory queue.
 
+    Handlers run on the QueueListener's background thread, so logging
+    never blocks the event loop on a stdout/stderr write.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
 
-# ============================================================
-# AI Module Loading
-# ============================================================
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+_log_listener = _configure_logging()
+logger = logging.getLogger(__name__)
 
-def _load_ai_module():
-    """Load AI module (router + service functions)"""
-    try:
-        from ai.app import router as ai_router, analyze_text, analyze_image_bytes, is_ai_available
-        return ai_router, analyze_text, analyze_image_bytes, is_ai_available
-    except Exception as e:
-        print(f"[AI] Module load failed: {e}")
-        return None, None, None, lambda: False
 
+# ============================================================
+# Database and Services
+# ============================================================
 
-ai_router, ai_analyze_text, ai_analyze_image_bytes, ai_is_available = _load_ai_module()
+from database import http_client, supabase_async
+from helpers import ai_helpers
 
 
 # ============================================================
 # SSE Broker for Real-time Updates
 # ============================================================
 
+# Per-subscriber queue bound; a slow client past this gets a resync instead of a backlog
+SSE_QUEUE_MAXSIZE = 256
+SSE_RESYNC_MESSAGE = b"event: resync\ndata: {}\n\n"
+SSE_LOCK_SHARDS = 16  # power of two
+
+
+@lru_cache(maxsize=None)
+def _sse_prefix(event: str) -> bytes:
+    """Encoded SSE frame prefix (event line + "data: ") for an event name."""
+    return b"event: " + event.encode() + b"\ndata: "
+
+
 class _SseBroker:
     """Server-Sent Events broker for user-specific event streams."""
 
     def __init__(self) -> None:
-        self._queues_by_user: Dict[str, set[asyncio.Queue[str]]] = {}
-        self._lock = asyncio.Lock()
+        # Immutable tuples: writers swap in a new tuple under the user's lock
+        # shard, publish reads the current one without locking.
+        self._queues_by_user: Dict[str, Tuple[asyncio.Queue[bytes], ...]] = {}
+        self._locks = [asyncio.Lock() for _ in range(SSE_LOCK_SHARDS)]
+
+    def _lock_for(self, user_id: str) -> asyncio.Lock:
+        return self._locks[hash(user_id) & (SSE_LOCK_SHARDS - 1)]
 
-    async def subscribe(self, user_id: str) -> asyncio.Queue[str]:
+    async def subscribe(self, user_id: str) -> asyncio.Queue[bytes]:
         """Subscribe to user's event stream."""
-        queue: asyncio.Queue[str] = asyncio.Queue()
-        async with self._lock:
-            self._queues_by_user.setdefault(user_id, set()).add(queue)
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=SSE_QUEUE_MAXSIZE)
+        async with self._lock_for(user_id):
+            self._queues_by_user[user_id] = self._queues_by_user.get(user_id, ()) + (queue,)
         return queue
 
-    async def unsubscribe(self, user_id: str, queue: asyncio.Queue[str]) -> None:
+    async def unsubscribe(self, user_id: str, queue: asyncio.Queue[bytes]) -> None:
         """Unsubscribe from user's event stream."""
-        async with self._lock:
-            queues = self._queues_by_user.get(user_id)
-            if not queues:
-                return
-            queues.discard(queue)
-            if not queues:
+        async with self._lock_for(user_id):
+            queues = tuple(q for q in self._queues_by_user.get(user_id, ()) if q is not queue)
+            if queues:
+                self._queues_by_user[user_id] = queues
+            else:
                 self._queues_by_user.pop(user_id, None)
 
     async def publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
         """Publish event to user's subscribers."""
-        payload = json.dumps(data, ensure_ascii=False)
-        message = f"event: {event}\ndata: {payload}\n\n"
-        async with self._lock:
-            queues = list(self._queues_by_user.get(user_id, set()))
-        for queue in queues:
+        # Encoded once to bytes here, then shared by every subscriber queue
+        message = _sse_prefix(event) + orjson.dumps(data) + b"\n\n"
+        for queue in self._queues_by_user.get(user_id, ()):
             try:
                 queue.put_nowait(message)
             except asyncio.QueueFull:
-                pass
+                # Drop the backlog; the client refetches on resync
+                self._drain(queue)
+                queue.put_nowait(SSE_RESYNC_MESSAGE)
+                queue.put_nowait(message)
+
+    @staticmethod
+    def _drain(queue: asyncio.Queue[bytes]) -> None:
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
 
 
 _broker = _SseBroker()
@@ -91,7 +133,9 @@ _broker = _SseBroker()
 app = FastAPI(
     title="OneGate API",
     description="AI-powered quick input backend for Calendar and Notion",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson-encoded responses (record listings, analysis results)
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
@@ -107,13 +151,6 @@ app.add_middleware(
 # Router Mounting
 # ============================================================
 
-# AI Router (if available)
-if ai_router is not None:
-    app.include_router(ai_router)
-    print("[AI] Gemini AI router mounted")
-else:
-    print("[AI] AI router disabled - fallback classification mode")
-
 # API Routers
 from api import records, notion, calendar, categories
 
@@ -132,7 +169,16 @@ app.include_router(calendar.router)
 # Categories router (/categories/*)
 app.include_router(categories.router)
 
-print("[API] All routers mounted successfully")
+logger.info("[API] All routers mounted successfully")
+
+
+async def _mount_ai_router() -> None:
+    """Load the AI module off the event loop and mount its router (if available)."""
+    if await ai_helpers.load_ai_module():
+        app.include_router(ai_helpers.ai_router)
+        logger.info("[AI] Gemini AI router mounted")
+    else:
+        logger.warning("[AI] AI router disabled - fallback classification mode")
 
 
 # ============================================================
@@ -142,10 +188,10 @@ print("[API] All routers mounted successfully")
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
-    return {
+    return ORJSONResponse({
         "status": "ok",
-        "ai_available": ai_is_available() if ai_is_available else False
-    }
+        "ai_available": ai_helpers.ai_is_available()
+    })
 
 
 # ============================================================
@@ -155,15 +201,22 @@ async def health_check():
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup."""
-    print("=" * 50)
-    print("OneGate Backend Started")
-    print("=" * 50)
-    print(f"AI Module: {'Enabled' if ai_router else 'Disabled (Fallback Mode)'}")
-    print(f"Database: Connected to Supabase")
-    print("=" * 50)
+    # Refresh expiring Notion OAuth tokens in the background
+    app.state.notion_token_refresher = asyncio.create_task(notion.refresh_expiring_notion_tokens())
+    # The AI module (Gemini SDK, Pillow) is imported in the background so startup isn't held up
+    app.state.ai_loader = asyncio.create_task(_mount_ai_router())
+
+    logger.info("OneGate Backend Started")
+    logger.info("AI Module: Loading in background")
+    logger.info("Database: Connected to Supabase")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
-    print("OneGate Backend Shutting Down...")
+    logger.info("OneGate Backend Shutting Down...")
+    app.state.notion_token_refresher.cancel()
+    app.state.ai_loader.cancel()
+    await http_client.aclose()
+    await supabase_async.postgrest.aclose()
+    _log_listener.stop()
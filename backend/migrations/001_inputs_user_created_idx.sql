@@ -0,0 +1,5 @@
+-- Record list (/records): WHERE user_id = ? AND deleted_at IS NULL ORDER BY created_at DESC
+-- Run in the Supabase SQL editor (CONCURRENTLY can't run inside a transaction block).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inputs_user_created
+    ON inputs (user_id, created_at DESC)
+    WHERE deleted_at IS NULL;
@@ -0,0 +1,5 @@
+-- /calendar/sync upserts CALENDAR categories with ON CONFLICT (user_id, type, name).
+-- Resolve existing duplicate (user_id, type, name) rows before running this.
+-- Run in the Supabase SQL editor (CONCURRENTLY can't run inside a transaction block).
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS category_user_type_name_key
+    ON category (user_id, type, name);
@@ -0,0 +1,10 @@
+-- Notion OAuth refresh: the callback and the background refresher store the
+-- refresh token and expiry when Notion returns them (api/notion.py).
+-- Refresher scan: WHERE notion_refresh_token IS NOT NULL AND notion_expires_at <= ?
+-- Run in the Supabase SQL editor before deploying the token refresh.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS notion_refresh_token text;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS notion_expires_at timestamptz;
+
+CREATE INDEX IF NOT EXISTS idx_users_notion_expires_at
+    ON users (notion_expires_at)
+    WHERE notion_refresh_token IS NOT NULL;
@@ -5,6 +5,8 @@ Pydantic models for request/response validation.
 from pydantic import BaseModel, field_validator
 from typing import Optional, List, Dict, Any, Literal
 
+from helpers.date_utils import _parse_iso_date, _parse_iso_datetime
+
 
 class AIAnalysisData(BaseModel):
     # ========== 공통 필수 ==========
@@ -47,8 +49,6 @@ class AIAnalysisData(BaseModel):
             return value
         if not isinstance(value, str):
             raise ValueError("must be a string datetime")
-        # Import here to avoid circular dependency
-        from helpers.date_utils import _parse_iso_datetime
         _parse_iso_datetime(value)
         return value
 
@@ -59,8 +59,6 @@ class AIAnalysisData(BaseModel):
             return value
         if not isinstance(value, str):
             raise ValueError("must be a string date")
-        # Import here to avoid circular dependency
-        from helpers.date_utils import _parse_iso_date
         _parse_iso_date(value)
         return value
 
@@ -70,9 +68,13 @@ class UpdateRecordRequest(BaseModel):
     text: Optional[str] = None
 
 
+# Select options of the One Gate Notion database's category property
+NotionMemoCategory = Literal["아이디어", "할 일", "메모", "일정", "기타"]
+
+
 class NotionMemoRequest(BaseModel):
     content: str
-    category: str = "아이디어"
+    category: NotionMemoCategory = "아이디어"
 
 
 class CategoryRequest(BaseModel):
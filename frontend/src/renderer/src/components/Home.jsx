@@ -8,6 +8,28 @@ import { ConfirmModal } from './ConfirmModal'
 import { Toast } from './ui/Toast'
 import { SettingsIcon, RefreshIcon, LogoutIcon } from './ui/Icons'
 
+// Page size for /records requests (matches the backend default)
+const RECORDS_PAGE_SIZE = 100
+
+// Map a /records row to a card
+const toCard = (record) => {
+  const createdAt = record.created_at ? new Date(record.created_at) : null
+
+  // result.analysis_failed가 true이면 분석 실패 상태
+  const isAnalysisFailed = record.result?.analysis_failed === true
+  const status = isAnalysisFailed ? 'analysis_failed' : (record.status?.toLowerCase() || 'pending')
+
+  return {
+    id: String(record.id),
+    summary: isAnalysisFailed ? (record.text || '분석 실패') : (record.result?.summary || record.text),
+    category: record.category?.name || record.result?.category || 'general',
+    date: createdAt ? createdAt.toLocaleDateString('ko-KR') : '',
+    status,
+    categoryType: record.type === 'CALENDAR' ? '일정' : '메모',
+    rawData: record
+  }
+}
+
 export function Home({ user, session, onNavigateToSettings }) {
   const [activeTab, setActiveTab] = useState('전체')
   const [isBulkSelectMode, setIsBulkSelectMode] = useState(false)
@@ -16,6 +38,8 @@ export function Home({ user, session, onNavigateToSettings }) {
   const [isUploading, setIsUploading] = useState(false)
   const [cards, setCards] = useState([])
   const [loading, setLoading] = useState(false)
+  const [hasMore, setHasMore] = useState(false)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [showBulkDeleteConfirm, setShowBulkDeleteConfirm] = useState(false)
   const [showLogoutConfirm, setShowLogoutConfirm] = useState(false)
   const [toast, setToast] = useState(null)
@@ -24,46 +48,62 @@ export function Home({ user, session, onNavigateToSettings }) {
     setToast({ message, type })
   }
 
-  // Fetch records from backend
+  // Fetch the first page of records from backend
   const fetchRecords = async () => {
     if (!user?.id) return
 
     setLoading(true)
     try {
-      const res = await api.get('/records', { params: { user_id: user.id } })
-      if (res.data?.status === 'success') {
-        const transformedCards = (res.data?.data || []).map((record) => {
-          const createdAt = record.created_at ? new Date(record.created_at) : null
-
-          // result.analysis_failed가 true이면 분석 실패 상태
-          const isAnalysisFailed = record.result?.analysis_failed === true
-          const status = isAnalysisFailed ? 'analysis_failed' : (record.status?.toLowerCase() || 'pending')
-
-          return {
-            id: String(record.id),
-            summary: isAnalysisFailed ? (record.text || '분석 실패') : (record.result?.summary || record.text),
-            category: record.category?.name || record.result?.category || 'general',
-            date: createdAt ? createdAt.toLocaleDateString('ko-KR') : '',
-            status,
-            categoryType: record.type === 'CALENDAR' ? '일정' : '메모',
-            rawData: record
-          }
-        })
-        setCards(transformedCards)
-      }
+      const res = await api.get('/records', {
+        params: { user_id: user.id, limit: RECORDS_PAGE_SIZE }
+      })
+      const records = res.data?.status === 'success' ? res.data?.data || [] : []
+      setCards(records.map(toCard))
+      setHasMore(records.length === RECORDS_PAGE_SIZE)
     } catch (err) {
       console.error('데이터 로드 실패:', err)
       setCards([])
+      setHasMore(false)
     } finally {
       setLoading(false)
     }
   }
 
+  // Fetch the next page, keyed by the oldest loaded record (new records don't shift it)
+  const loadMoreRecords = async () => {
+    const oldest = cards[cards.length - 1]?.rawData
+    if (!user?.id || !oldest?.created_at || loadingMore) return
+
+    setLoadingMore(true)
+    try {
+      const res = await api.get('/records', {
+        params: {
+          user_id: user.id,
+          limit: RECORDS_PAGE_SIZE,
+          before: oldest.created_at,
+          before_id: oldest.id
+        }
+      })
+      const records = res.data?.status === 'success' ? res.data?.data || [] : []
+      setCards((prev) => {
+        const loaded = new Set(prev.map((c) => c.id))
+        return [...prev, ...records.map(toCard).filter((c) => !loaded.has(c.id))]
+      })
+      setHasMore(records.length === RECORDS_PAGE_SIZE)
+    } catch (err) {
+      console.error('데이터 로드 실패:', err)
+      showToast('항목을 더 불러오지 못했습니다.', 'error')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => {
     if (user?.id) {
       fetchRecords()
     } else {
       setCards([])
+      setHasMore(false)
       setLoading(false)
     }
   }, [user?.id])
@@ -142,7 +182,7 @@ export function Home({ user, session, onNavigateToSettings }) {
           // 새 카드를 목록 최상단에 추가
           const newCard = {
             id: String(recordId),
-            summary: payload.text || (payload.image_url ? '이미지 분석 중...' : '진행 중...'),
+            summary: payload.text || (payload.has_image || payload.image_url ? '이미지 분석 중...' : '진행 중...'),
             category: 'general',
             date: payload.created_at
               ? new Date(payload.created_at).toLocaleDateString('ko-KR')
@@ -204,6 +244,30 @@ export function Home({ user, session, onNavigateToSettings }) {
         }
       })
 
+      // image_ready: 이미지 업로드 완료 시 image_url 반영
+      es.addEventListener('image_ready', (evt) => {
+        try {
+          const payload = JSON.parse(evt.data)
+          const recordId = payload?.record_id
+          if (!recordId) return
+
+          setCards((prev) =>
+            prev.map((card) =>
+              card.id === String(recordId)
+                ? { ...card, rawData: { ...card.rawData, image_url: payload.image_url } }
+                : card
+            )
+          )
+        } catch (e) {
+          console.error('SSE image_ready parse error:', e)
+        }
+      })
+
+      // resync: 서버 큐가 가득 차 이벤트가 누락됨 → 전체 재조회
+      es.addEventListener('resync', () => {
+        fetchRecords()
+      })
+
       es.addEventListener('record_updated', (evt) => {
         try {
           applyRecordEvent(JSON.parse(evt.data))
@@ -704,6 +768,25 @@ export function Home({ user, session, onNavigateToSettings }) {
             ))}
           </div>
         )}
+
+        {!loading && hasMore && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={loadMoreRecords}
+              disabled={loadingMore}
+              className="px-5 py-2 rounded-xl transition-all disabled:opacity-40"
+              style={{
+                background: 'var(--surface-primary)',
+                color: 'var(--text-secondary)',
+                border: '1px solid var(--divider)',
+                fontWeight: '500',
+                fontSize: '14px'
+              }}
+            >
+              {loadingMore ? '불러오는 중...' : '더 보기'}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Card Detail Popover */}